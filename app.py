@@ -1,32 +1,107 @@
+"""
+Flag Football Stats API.
+
+Importing this module does no I/O (worker spawns, scripts and benchmarks only
+pay for imports). The application is built by create_app(), either through the
+factory or on first access of `app`, so both entrypoints work:
+
+    uvicorn --factory app:create_app
+    uvicorn app:app  /  fastapi run app.py
+"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from database.create_models import create_database, recreate_all_tables
+from database.database import async_reads_enabled, dispose_engine, load_environment, query_stats_enabled, query_repeat_threshold, metrics_enabled
+from monitoring.profiling import ProfilingMiddleware, profiling_token, profile_dir
 from models.player import Player
 from models.game import Game
 from models.player_stats import PlayerStats
 from models.team import Team
-from routers import player, game, team, stats
+from models.player_season_totals import PlayerSeasonTotals
+from models.person import Person
+from models.team_matchup import TeamMatchup
+from routers import player, game, team, stats, leaders, standings, health
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Engines are created lazily by the first request; release their pools on shutdown
+    dispose_engine()
+    if async_reads_enabled():
+        from database.async_database import dispose_async_engine
+        await dispose_async_engine()
+
+def create_app():
+    """
+    Build the API application. Loads .env first, because the flags read below
+    decide which middleware and routers are installed. Nothing here touches the
+    database.
+    """
+    load_environment()
+
+    app = FastAPI(
+        title="Flag Football Stats API",
+        version="1.0.0",
+        description="API for managing flag football statistics",
+        lifespan=lifespan
+    )
+
+    if query_stats_enabled():
+        from monitoring.queries import QueryStatsMiddleware
+        app.add_middleware(QueryStatsMiddleware, repeat_threshold=query_repeat_threshold())
+
+    # Only installed when a token is configured, so regular deployments pay nothing
+    if profiling_token():
+        app.add_middleware(ProfilingMiddleware, token=profiling_token(), artifact_dir=profile_dir())
+
+    # Added last so it is outermost and times the whole request
+    if metrics_enabled():
+        from monitoring.metrics import MetricsMiddleware
+        from routers import metrics
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
+
+    # Async read endpoints shadow their sync counterparts when enabled
+    if async_reads_enabled():
+        from routers import async_reads
+        app.include_router(async_reads.router)
+
+    # Include all routers
+    app.include_router(player.router)
+    app.include_router(game.router)
+    app.include_router(team.router)
+    app.include_router(standings.router)
+    # Before stats so /stats/leaders is not captured by /stats/{stats_id}
+    app.include_router(leaders.router)
+    app.include_router(stats.router)
+    app.include_router(health.router)
+    return app
+
+_app = None
 
-app = FastAPI(
-    title="Flag Football Stats API",
-    version="1.0.0",
-    description="API for managing flag football statistics"
-)
+def __getattr__(name):
+    """Build the module-level `app` on first access (PEP 562) rather than at import"""
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Include all routers
-app.include_router(player.router)
-app.include_router(game.router)
-app.include_router(team.router)
-app.include_router(stats.router)
+def __dir__():
+    # fastapi run finds the application by looking for `app` in dir(module)
+    return sorted([*globals(), 'app'])
 
 def create_db():
     # Import all models to ensure they're registered with SQLAlchemy
-    from models import player, game, player_stats, team
+    from models import player, game, player_stats, team, player_season_totals, person, team_matchup
+    from database.create_models import create_database
     
     # create db
     create_database()
     
 def main():
+    from database.create_models import recreate_all_tables
     recreate_all_tables()
     
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,156 @@
+"""
+Serialization benchmark for the large list endpoints.
+
+Seeds a throwaway SQLite database, then times the previous read path (ORM
+objects, hand-built Pydantic models, response_model validation and
+serialization) against the Core fast path (column tuples encoded straight to
+JSON) for the players, teams and stats batch listings, in rows per second.
+
+    python bench_serialization.py [--rows 20000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+def seed(db, rows):
+    from models.team import Team
+    from models.player import Player
+    from models.game import Game
+    from models.player_stats import PlayerStats
+    now = datetime.utcnow()
+    teams = [Team(name=f"Team {i}", season=2025, league="L", created_at=now, updated_at=now) for i in range(max(2, rows // 50))]
+    db.add_all(teams)
+    db.flush()
+    games = [Game(week=1 + i % 7, season=2025, league="L", team1_id=teams[0].id, team2_id=teams[1].id) for i in range(max(1, rows // 20))]
+    db.add_all(games)
+    db.flush()
+    db.execute(Player.__table__.insert(), [
+        dict(name=f"Player {i}", team_id=teams[i % len(teams)].id, season=2025, jersey_number=str(i % 99) if i % 3 else None)
+        for i in range(rows)
+    ])
+    db.execute(PlayerStats.__table__.insert(), [
+        dict(player_id=i + 1, game_id=games[i % len(games)].id, passing_tds=i % 5, receptions=i % 7, flag_pulls=i % 3)
+        for i in range(rows)
+    ])
+    db.commit()
+
+def legacy_players(db, limit):
+    from pydantic import TypeAdapter
+    from models.player import Player
+    from schemas.players import PlayerOut
+    players = db.query(Player).order_by(Player.id).limit(limit).all()
+    out = [
+        PlayerOut(
+            id=player.id, name=player.name, team_id=player.team_id,
+            team_name=player.team.name if player.team else None, season=player.season,
+            display_name=f"#{player.jersey_number} {player.name}" if player.jersey_number else player.name,
+            is_active=player.is_active, jersey_number=player.jersey_number, version=player.version,
+            created_at=player.created_at, updated_at=player.updated_at,
+            is_deleted=player.is_deleted, deleted_at=player.deleted_at
+        ) for player in players
+    ]
+    adapter = TypeAdapter(List[PlayerOut])
+    return adapter.dump_json(adapter.validate_python(out))
+
+def fast_players(db, limit):
+    from routers.fast_json import dumps, rows_to_dicts
+    from routers.player import player_list_item, players_list_query
+    players = rows_to_dicts(db.execute(players_list_query(0, limit, False)))
+    return dumps([player_list_item(player) for player in players])
+
+def legacy_teams(db, limit):
+    from pydantic import TypeAdapter
+    from sqlalchemy.orm import joinedload
+    from models.team import Team
+    from schemas.teams import TeamOut, PlayerOut
+    teams = db.query(Team).options(joinedload(Team.players)).order_by(Team.id).limit(limit).all()
+    out = [
+        TeamOut(
+            id=team.id, name=team.name, season=team.season, league=team.league,
+            wins=team.wins, losses=team.losses, ties=team.ties, version=team.version,
+            is_deleted=team.is_deleted, created_at=team.created_at, updated_at=team.updated_at,
+            deleted_at=team.deleted_at, display_name=f"{team.name} (Season {team.season})",
+            players=[
+                PlayerOut(
+                    id=player.id, name=player.name, team_id=team.id, team_name=team.name, season=player.season,
+                    display_name=player.name, is_active=player.is_active, jersey_number=player.jersey_number,
+                    version=player.version, is_deleted=player.is_deleted, created_at=player.created_at,
+                    updated_at=player.updated_at, deleted_at=player.deleted_at
+                ) for player in team.players
+            ]
+        ) for team in teams
+    ]
+    adapter = TypeAdapter(List[TeamOut])
+    return adapter.dump_json(adapter.validate_python(out))
+
+def fast_teams(db, limit):
+    from routers.fast_json import dumps, rows_to_dicts
+    from routers.team import team_list_item, teams_list_query
+    teams = rows_to_dicts(db.execute(teams_list_query(0, limit, False)))
+    return dumps([team_list_item(team) for team in teams])
+
+def legacy_stats(db, limit):
+    from pydantic import TypeAdapter
+    from routers.stats import batch_stats_query, build_stats_out
+    from schemas.player_stats import PlayerStatsOut
+    out = [build_stats_out(row) for row in db.execute(batch_stats_query(season=2025)).all()]
+    adapter = TypeAdapter(List[PlayerStatsOut])
+    return adapter.dump_json(adapter.validate_python(out))
+
+def fast_stats(db, limit):
+    from routers.fast_json import dumps, rows_to_dicts
+    from routers.stats import batch_stats_query
+    return dumps(rows_to_dicts(db.execute(batch_stats_query(season=2025))))
+
+CASES = [
+    ("players", legacy_players, fast_players),
+    ("teams", legacy_teams, fast_teams),
+    ("stats batch", legacy_stats, fast_stats),
+]
+
+def measure(session_factory, func, limit, repeat):
+    """Best rows/second over `repeat` runs, each in a fresh session"""
+    best = None
+    for _ in range(repeat):
+        with session_factory() as db:
+            started = time.perf_counter()
+            body = func(db, limit)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy and fast list serialization")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ['DB_TYPE'] = 'sqlite'
+    os.environ['SQLITE_PATH'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ['DB_QUERY_STATS'] = '0'
+    os.environ['METRICS_ENABLED'] = '0'
+
+    import app  # noqa: F401  registers every model
+    from database.database import Base, get_engine, get_sessionmaker
+    from models.team import Team
+    Base.metadata.create_all(bind=get_engine())
+    SessionLocal = get_sessionmaker()
+    with SessionLocal() as db:
+        seed(db, args.rows)
+        team_count = db.query(Team).count()
+
+    print(f"{'endpoint':<12} {'rows':>7} {'legacy rows/s':>14} {'fast rows/s':>12} {'speedup':>8}")
+    for name, legacy, fast in CASES:
+        rows = team_count if name == "teams" else args.rows
+        legacy_time, _ = measure(SessionLocal, legacy, args.rows, args.repeat)
+        fast_time, _ = measure(SessionLocal, fast, args.rows, args.repeat)
+        print(f"{name:<12} {rows:>7} {rows / legacy_time:>14,.0f} {rows / fast_time:>12,.0f} {legacy_time / fast_time:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
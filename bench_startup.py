@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark for the API.
+
+Imports app.py in a fresh interpreter under `python -X importtime`, reports the
+slowest imports, times create_app() in another fresh interpreter, and fails if
+import plus app construction exceeds the budget.
+
+    python bench_startup.py [--budget-ms 1500] [--top 15] [--runs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 1500
+
+def run_importtime():
+    """Import app in a fresh interpreter and return {module: (self_us, cumulative_us)}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr}")
+    if result.stdout.strip():
+        print(f"Warning: importing app wrote to stdout:\n{result.stdout}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+# Imports app first so only the factory itself is timed
+CREATE_APP_SCRIPT = """
+import time
+import app
+start = time.perf_counter()
+app.create_app()
+print(f"create_app_ms={(time.perf_counter() - start) * 1000}")
+"""
+
+def run_create_app():
+    """Build the application in a fresh interpreter and return the create_app() time in ms"""
+    result = subprocess.run(
+        [sys.executable, '-c', CREATE_APP_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"create_app() failed:\n{result.stderr}")
+    for line in result.stdout.splitlines():
+        if line.startswith('create_app_ms='):
+            return float(line[len('create_app_ms='):])
+    raise RuntimeError(f"create_app() timing missing from output:\n{result.stdout}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold-start import time")
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', DEFAULT_BUDGET_MS)))
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    # Keep the fastest run; the first one also pays for cold .pyc compilation
+    best = None
+    for _ in range(args.runs):
+        timings = run_importtime()
+        if best is None or timings['app'][1] < best['app'][1]:
+            best = timings
+
+    import_ms = best['app'][1] / 1000
+    create_ms = min(run_create_app() for _ in range(args.runs))
+    total_ms = import_ms + create_ms
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for module, (self_us, cumulative_us) in sorted(best.items(), key=lambda item: item[1][1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {module}")
+    print(f"\nimport app: {import_ms:.1f} ms")
+    print(f"create_app(): {create_ms:.1f} ms")
+    print(f"total: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if total_ms > args.budget_ms:
+        print("Startup budget exceeded")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
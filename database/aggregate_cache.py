@@ -0,0 +1,129 @@
+from collections import OrderedDict
+import threading
+
+from database.database import _env_int, load_environment
+
+# Process-wide cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+class AggregateCache:
+    """
+    In-process LRU cache for aggregate responses (leaderboards, standings).
+
+    Entries are stored with the data version of their season at compute time.
+    Writes bump the season's version, so the next read of any key for that
+    season recomputes once; other seasons keep their entries. Entries stored
+    under season None span every season and go stale on any write.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        # Bumped by invalidate_all(); part of every season's version
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _version(self, season):
+        return (self._epoch, self._versions.get(season, 0))
+
+    def season_version(self, season):
+        with self._lock:
+            return self._version(season)
+
+    def invalidate(self, *seasons):
+        """Bump the data version of each season; its cached entries become stale"""
+        with self._lock:
+            for season in set(seasons) | {None}:
+                self._versions[season] = self._versions.get(season, 0) + 1
+
+    def invalidate_all(self):
+        """Make every cached entry stale, whatever its season"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def get_or_compute(self, key, season, compute):
+        """
+        Return the cached value for `key` if it was computed at the season's
+        current version, otherwise call `compute()` and cache the result.
+        """
+        with self._lock:
+            version = self._version(season)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # A write during compute() makes this result stale already; skip caching it
+            if self._version(season) == version and self.max_entries > 0:
+                self._entries[key] = (version, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+def get_aggregate_cache():
+    """Return the process-wide aggregate cache (size from AGGREGATE_CACHE_SIZE, 0 disables)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                load_environment()
+                _cache = AggregateCache(_env_int('AGGREGATE_CACHE_SIZE', 256))
+    return _cache
+
+def invalidate_seasons(*seasons):
+    """Mark cached aggregates of these seasons stale; call after the write commits"""
+    get_aggregate_cache().invalidate(*seasons)
+
+def invalidate_all_seasons():
+    """Mark every cached aggregate stale, for writes that span all seasons"""
+    get_aggregate_cache().invalidate_all()
+
+# Box scores of completed games. Every stats write path (create, bulk, update
+# and delete) rejects completed games, so these are kept for the life of the
+# process and only dropped when the game itself, or a team or player name shown
+# in it, changes.
+_final_boxscores = {}
+_final_boxscores_lock = threading.Lock()
+
+def get_final_boxscore(game_id):
+    with _final_boxscores_lock:
+        return _final_boxscores.get(game_id)
+
+def store_final_boxscore(game_id, boxscore):
+    with _final_boxscores_lock:
+        _final_boxscores[game_id] = boxscore
+
+def forget_final_boxscores(*game_ids):
+    """Drop the box scores of these games, or of every game when none are given"""
+    with _final_boxscores_lock:
+        if not game_ids:
+            _final_boxscores.clear()
+        for game_id in game_ids:
+            _final_boxscores.pop(game_id, None)
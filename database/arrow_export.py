@@ -0,0 +1,69 @@
+import io
+import os
+from datetime import datetime
+
+# Columnar export helpers. pyarrow is an optional dependency: it is imported on
+# use, and callers check arrow_available() before starting an export.
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def arrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def arrow_schema(query):
+    """Arrow schema for the columns a select returns, from their SQL types"""
+    import pyarrow as pa
+    types = {
+        int: pa.int64(),
+        str: pa.string(),
+        bool: pa.bool_(),
+        # Timestamps are stored in UTC
+        datetime: pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([
+        pa.field(column.name, types.get(column.type.python_type, pa.string()))
+        for column in query.selected_columns
+    ])
+
+def record_batch(rows, schema):
+    """Build one RecordBatch from a partition of result rows"""
+    import pyarrow as pa
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.record_batch(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+def arrow_ipc_stream(result, schema):
+    """
+    Encode a result read with yield_per as an Arrow IPC stream, yielding the
+    bytes of each record batch as soon as it is written.
+    """
+    import pyarrow as pa
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in result.partitions():
+            writer.write_batch(record_batch(rows, schema))
+            yield _drain(sink)
+    yield _drain(sink)
+
+def _drain(sink):
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+def write_parquet(result, schema, path):
+    """Write a result read with yield_per to a Parquet file one row group per partition"""
+    import pyarrow.parquet as pq
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows_written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in result.partitions():
+            writer.write_batch(record_batch(rows, schema))
+            rows_written += len(rows)
+    return rows_written
@@ -0,0 +1,54 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import threading
+
+from database.database import get_database_url, get_pool_options, install_monitoring
+
+# Process-wide async engine and session factory, created on first use
+_async_engine = None
+_AsyncSessionLocal = None
+_async_engine_lock = threading.Lock()
+
+def get_async_database_url():
+    url = make_url(get_database_url())
+    if url.get_backend_name() != 'sqlite':
+        raise ValueError(f"Async database access is not supported for {url.get_backend_name()}")
+    return url.set(drivername='sqlite+aiosqlite').render_as_string(hide_password=False)
+
+def create_async_db_engine():
+    uri = get_async_database_url()
+    engine = create_async_engine(uri, **get_pool_options(uri))
+    from database.sqlite_profile import production_profile_enabled, install_production_profile
+    if production_profile_enabled():
+        install_production_profile(engine.sync_engine)
+    install_monitoring(engine.sync_engine)
+    return engine
+
+def get_async_engine():
+    """Return the process-wide async engine, creating it on first use"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                engine = create_async_db_engine()
+                _AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+                _async_engine = engine
+    return _async_engine
+
+def get_async_sessionmaker():
+    get_async_engine()
+    return _AsyncSessionLocal
+
+async def dispose_async_engine():
+    """Close all pooled async connections and forget the async engine"""
+    global _async_engine, _AsyncSessionLocal
+    engine = _async_engine
+    _async_engine = None
+    _AsyncSessionLocal = None
+    if engine is not None:
+        await engine.dispose()
+
+# Get async database session
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
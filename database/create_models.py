@@ -3,11 +3,17 @@ from models.player import Player
 from models.game import Game
 from models.player_stats import PlayerStats
 from models.team import Team
+from models.player_season_totals import PlayerSeasonTotals
+from models.person import Person
+from models.team_matchup import TeamMatchup
 import traceback
-from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy import create_engine, MetaData, text, inspect
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import sessionmaker, clear_mappers
-from database.database import Base, engine
+from database.database import Base
 import importlib
+import sys
+from database.people import link_people
 
 def recreate_all_tables():
     """Recreate all tables in the correct order"""
@@ -24,8 +30,11 @@ def recreate_all_tables():
             conn.execute(text("DROP INDEX IF EXISTS ix_teams_id"))
             
             # Then drop tables
+            conn.execute(text("DROP TABLE IF EXISTS player_season_totals"))
+            conn.execute(text("DROP TABLE IF EXISTS team_matchups"))
             conn.execute(text("DROP TABLE IF EXISTS player_stats"))
             conn.execute(text("DROP TABLE IF EXISTS players"))
+            conn.execute(text("DROP TABLE IF EXISTS people"))
             conn.execute(text("DROP TABLE IF EXISTS games"))
             conn.execute(text("DROP TABLE IF EXISTS teams"))
             conn.commit()
@@ -38,9 +47,12 @@ def recreate_all_tables():
         # Reload all models
         importlib.reload(importlib.import_module('models.base_model'))
         importlib.reload(importlib.import_module('models.team'))
+        importlib.reload(importlib.import_module('models.person'))
         importlib.reload(importlib.import_module('models.player'))
         importlib.reload(importlib.import_module('models.game'))
         importlib.reload(importlib.import_module('models.player_stats'))
+        importlib.reload(importlib.import_module('models.player_season_totals'))
+        importlib.reload(importlib.import_module('models.team_matchup'))
         
         # Create all tables (SQLAlchemy will handle dependencies)
         Base.metadata.create_all(bind=engine)
@@ -65,7 +77,7 @@ def create_database():
         print(f"Database URL: {engine.url}")
         
         # Import all models to ensure they're registered with Base.metadata
-        from models import player, game, player_stats, team
+        from models import player, game, player_stats, team, player_season_totals, person, team_matchup
         
         # Print tables that will be created
         print("Tables to be created:")
@@ -73,8 +85,30 @@ def create_database():
             print(f"- {table.name}")
             
         # Create all tables
+        had_totals = inspect(engine).has_table(PlayerSeasonTotals.__tablename__)
+        had_matchups = inspect(engine).has_table(TeamMatchup.__tablename__)
         Base.metadata.create_all(bind=engine)
         print("Database tables created successfully!")
+        # create_all skips tables that already exist, so add any new columns and
+        # indexes separately. Indexes go first: building the unique stats index
+        # deletes duplicate stat lines, which the seeded totals must not count.
+        apply_columns(engine)
+        apply_indexes(engine)
+        with SessionLocal() as db:
+            link_people(db)
+            db.commit()
+        if not had_totals:
+            # Seed the new totals table from any stats already recorded
+            from database.season_totals import rebuild_season_totals
+            with SessionLocal() as db:
+                rebuild_season_totals(db)
+                db.commit()
+        if not had_matchups:
+            # Seed head-to-head rows from games already completed
+            from database.team_records import rebuild_matchups
+            with SessionLocal() as db:
+                rebuild_matchups(db)
+                db.commit()
         return True
     except Exception as e:
         print(f"Failed to create database tables. Error: {e}")
@@ -85,5 +119,157 @@ def create_database():
         if engine:
             engine.dispose()
 
+def apply_columns(engine):
+    """
+    Add any model-declared column missing from an existing table (nullable, no
+    table rebuild). Foreign keys are not added to the existing table.
+    """
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                    added.append(f"{table.name}.{column.name}")
+    for name in added:
+        print(f"Added column {name}")
+    return added
+
+def apply_indexes(engine):
+    """Create any model-declared index missing from an existing database (no table rebuild)"""
+    created = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            for index in table.indexes:
+                if not inspector.has_index(table.name, index.name):
+                    if index.name == 'uq_player_stats_player_game':
+                        remove_duplicate_stats(conn)
+                    index.create(bind=conn)
+                    created.append(index.name)
+    for name in created:
+        print(f"Created index {name}")
+    return created
+
+def remove_duplicate_stats(conn):
+    """
+    Delete extra player_stats rows for the same (player_id, game_id) so the unique
+    index can be built. The live row with the highest id is kept.
+    """
+    result = conn.execute(text("""
+        DELETE FROM player_stats WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY player_id, game_id
+                    ORDER BY is_deleted, id DESC
+                ) AS rn
+                FROM player_stats
+            ) ranked WHERE rn > 1
+        )
+    """))
+    if result.rowcount:
+        print(f"Removed {result.rowcount} duplicate player_stats rows")
+    return result.rowcount
+
+def create_indexes():
+    """Add missing indexes to the configured database"""
+    engine = None
+    try:
+        engine, SessionLocal, Base = connect()
+        from models import player, game, player_stats, team, player_season_totals, person, team_matchup
+        apply_columns(engine)
+        apply_indexes(engine)
+        return True
+    except Exception as e:
+        print(f"Failed to create indexes. Error: {e}")
+        print("Full traceback:")
+        print(traceback.format_exc())
+        return False
+    finally:
+        if engine:
+            engine.dispose()
+
+def rebuild_totals():
+    """Recompute player_season_totals from player_stats (repair after manual edits)"""
+    engine = None
+    try:
+        engine, SessionLocal, Base = connect()
+        from database.season_totals import rebuild_season_totals
+        PlayerSeasonTotals.__table__.create(bind=engine, checkfirst=True)
+        with SessionLocal() as db:
+            count = rebuild_season_totals(db)
+            db.commit()
+        print(f"Rebuilt {count} player season totals rows")
+        return True
+    except Exception as e:
+        print(f"Failed to rebuild season totals. Error: {e}")
+        print("Full traceback:")
+        print(traceback.format_exc())
+        return False
+    finally:
+        if engine:
+            engine.dispose()
+
+def link_players():
+    """Create people for players rows that are not linked to one yet"""
+    engine = None
+    try:
+        engine, SessionLocal, Base = connect()
+        Person.__table__.create(bind=engine, checkfirst=True)
+        apply_columns(engine)
+        apply_indexes(engine)
+        with SessionLocal() as db:
+            count = link_people(db)
+            db.commit()
+        print(f"Linked {count} players rows to people")
+        return True
+    except Exception as e:
+        print(f"Failed to link players to people. Error: {e}")
+        print("Full traceback:")
+        print(traceback.format_exc())
+        return False
+    finally:
+        if engine:
+            engine.dispose()
+
+def reconcile_records(seasons=None):
+    """Recompute team wins/losses/ties and head-to-head rows from completed games (all seasons if none given)"""
+    engine = None
+    try:
+        engine, SessionLocal, Base = connect()
+        from database.team_records import reconcile_team_records, rebuild_matchups
+        TeamMatchup.__table__.create(bind=engine, checkfirst=True)
+        with SessionLocal() as db:
+            for season in seasons or [None]:
+                count = reconcile_team_records(db, season)
+                matchups = rebuild_matchups(db, season)
+                print(f"Corrected {count} team records and rebuilt {matchups} matchups" + (f" in season {season}" if season is not None else ""))
+            db.commit()
+        return True
+    except Exception as e:
+        print(f"Failed to reconcile team records. Error: {e}")
+        print("Full traceback:")
+        print(traceback.format_exc())
+        return False
+    finally:
+        if engine:
+            engine.dispose()
+
 if __name__ == "__main__":
-    recreate_all_tables() 
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "indexes":
+        create_indexes()
+    elif len(sys.argv) > 1 and sys.argv[1] == "totals":
+        rebuild_totals()
+    elif len(sys.argv) > 1 and sys.argv[1] == "people":
+        link_players()
+    elif len(sys.argv) > 1 and sys.argv[1] == "records":
+        reconcile_records([int(season) for season in sys.argv[2:]])
+    else:
+        recreate_all_tables()
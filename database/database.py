@@ -1,10 +1,9 @@
 from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 import os
+import threading
 from dotenv import load_dotenv
-import os
-
-load_dotenv()
 
 # dll_path = os.getenv("ibm_db_dll_path")
 # if dll_path:
@@ -15,13 +14,50 @@ load_dotenv()
 # Create a single Base instance that all models will use
 Base = declarative_base()
 
-def connect():
+# Process-wide engine and session factory, created on first use
+_env_loaded = False
+_engine = None
+_SessionLocal = None
+_engine_lock = threading.Lock()
+
+def load_environment():
+    """Load .env into the process environment once (existing variables win)"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def async_reads_enabled():
+    """Serve the read-heavy list endpoints from the async engine (ASYNC_READS=1)"""
+    return _env_bool('ASYNC_READS', False)
+
+def query_stats_enabled():
+    """Count and time SQL per request (DB_QUERY_STATS, on by default)"""
+    return _env_bool('DB_QUERY_STATS', True)
+
+def query_repeat_threshold():
+    """Repeats of one statement shape per request before an N+1 warning is logged"""
+    return _env_int('DB_N_PLUS_ONE_THRESHOLD', 10)
+
+def metrics_enabled():
+    """Expose Prometheus-style metrics at /metrics (METRICS_ENABLED, on by default)"""
+    return _env_bool('METRICS_ENABLED', True)
+
+def get_database_url():
     db_type = os.getenv('DB_TYPE', 'sqlite').lower()
-    print(f"DB_TYPE: {db_type}")
     if db_type == 'sqlite':
         sqlite_path = os.getenv('SQLITE_PATH', './db.sqlite3')
-        uri = f"{sqlite_path}"
-        engine = create_engine(uri, connect_args={'check_same_thread': False})
+        return f"{sqlite_path}"
     elif db_type == 'db2':
         db2_user = os.getenv('db2_user')
         db2_pw = os.getenv('db2_pw')
@@ -30,24 +66,115 @@ def connect():
         db2_db = os.getenv('db2_db')
         if not all([db2_user, db2_pw, db2_host, db2_port, db2_db]):
             raise ValueError("One or more DB2 environment variables are not set")
-        uri = f"db2+ibm_db://{db2_user}:{db2_pw}@{db2_host}:{db2_port}/{db2_db}"
-        engine = create_engine(uri)
+        return f"db2+ibm_db://{db2_user}:{db2_pw}@{db2_host}:{db2_port}/{db2_db}"
     else:
         raise ValueError(f"Unsupported DB_TYPE: {db_type}")
+
+def get_pool_options(uri):
+    """Pool settings read from the environment (DB_POOL_*)"""
+    options = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+    }
+    # In-memory SQLite uses a single-connection pool that has no size/overflow
+    database = make_url(uri).database
+    if not uri.startswith('sqlite') or database not in (None, '', ':memory:'):
+        options['pool_size'] = _env_int('DB_POOL_SIZE', 5)
+        options['max_overflow'] = _env_int('DB_MAX_OVERFLOW', 10)
+        options['pool_timeout'] = _env_int('DB_POOL_TIMEOUT', 30)
+    return options
+
+def create_db_engine():
+    load_environment()
+    db_type = os.getenv('DB_TYPE', 'sqlite').lower()
+    print(f"DB_TYPE: {db_type}")
+    uri = get_database_url()
+    if db_type == 'sqlite':
+        engine = create_engine(uri, connect_args={'check_same_thread': False}, **get_pool_options(uri))
+        from database.sqlite_profile import production_profile_enabled, install_production_profile
+        if production_profile_enabled():
+            install_production_profile(engine)
+    else:
+        engine = create_engine(uri, **get_pool_options(uri))
+    install_monitoring(engine)
+    return engine
+
+def install_monitoring(engine):
+    """Attach statement timing hooks for per-request stats and metrics, if enabled"""
+    observers = []
+    if metrics_enabled():
+        from monitoring.metrics import observe_statement
+        observers.append(observe_statement)
+    if query_stats_enabled() or observers:
+        from monitoring.queries import install_query_hooks
+        install_query_hooks(engine, observers)
+    from monitoring.profiling import profiling_token
+    if profiling_token():
+        from sqlalchemy import event
+        from monitoring.profiling import mark_profiled_thread
+        event.listen(engine, "before_cursor_execute", mark_profiled_thread)
+    return engine
+
+def connect():
+    """Create a new, unshared engine (for scripts that manage their own engine)"""
+    engine = create_db_engine()
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return engine, SessionLocal, Base
 
+def get_engine():
+    """Return the process-wide engine, creating it on first use"""
+    global _engine, _SessionLocal
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_db_engine()
+                _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                _engine = engine
+    return _engine
+
+def get_sessionmaker():
+    get_engine()
+    return _SessionLocal
+
+def dispose_engine():
+    """Close all pooled connections and forget the process-wide engine"""
+    global _engine, _SessionLocal
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _SessionLocal = None
+
+def get_pool_status():
+    """Snapshot of the process-wide connection pool"""
+    pool = get_engine().pool
+    status = {"pool_class": type(pool).__name__}
+    for key in ("size", "checkedin", "checkedout", "overflow"):
+        attr = getattr(pool, key, None)
+        status[key] = attr() if callable(attr) else None
+    return status
+
+def upsert_insert(db):
+    """The session dialect's insert() if it supports ON CONFLICT ... RETURNING, else None"""
+    dialect = db.get_bind().dialect
+    if not dialect.insert_returning:
+        return None
+    if dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
 # Get database session
 def get_db():
-    _, SessionLocal, _ = connect()
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
 
-engine, SessionLocal, Base = connect()
-
 class TestTable(Base):
     __tablename__ = "test_table"
     id = Column(Integer, primary_key=True, index=True)
@@ -56,6 +183,7 @@ class TestTable(Base):
 
 def create_test_table():
     try:
+        engine = get_engine()
         # Create all tables
         Base.metadata.create_all(bind=engine)
         print(f"Database URL: {engine.url}")
@@ -72,7 +200,7 @@ def create_test_table():
 def test_connection():
     try:
         # Try to connect to the database
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             print("Successfully connected to the database!")
             return True
     except Exception as e:
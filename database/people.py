@@ -0,0 +1,38 @@
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from models.person import Person
+from models.player import Player
+
+def person_for_name(db: Session, name: str):
+    """Id of the person named `name`, creating one in the caller's transaction if none exists"""
+    person_id = db.scalar(
+        select(Person.id).where(Person.name == name, Person.is_deleted == False).order_by(Person.id).limit(1)
+    )
+    if person_id is None:
+        person = Person(name=name)
+        db.add(person)
+        db.flush()
+        person_id = person.id
+    return person_id
+
+def link_people(db: Session):
+    """
+    Backfill people for players rows without a person_id: one person per distinct
+    name, then every unlinked row of that name points at it. Returns the number
+    of players rows linked.
+    """
+    unlinked = select(Player.name).where(
+        Player.person_id.is_(None),
+        Player.name.isnot(None),
+        ~exists().where(Person.name == Player.name)
+    ).distinct()
+    db.execute(insert(Person).from_select(['name'], unlinked))
+    person_id = select(func.min(Person.id)).where(Person.name == Player.name).scalar_subquery()
+    result = db.execute(
+        update(Player)
+        .where(Player.person_id.is_(None), Player.name.isnot(None))
+        .values(person_id=person_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
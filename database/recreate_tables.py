@@ -5,6 +5,8 @@ from models.team import Team
 from models.player import Player
 from models.game import Game
 from models.player_stats import PlayerStats
+from models.person import Person
+from models.team_matchup import TeamMatchup
 
 def recreate_tables():
     """Recreate all database tables"""
@@ -0,0 +1,117 @@
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from database.database import upsert_insert
+from models.game import Game
+from models.player_stats import PlayerStats
+from models.player_season_totals import PlayerSeasonTotals, TOTAL_FIELDS
+
+# Weeks played as playoffs; everything else is regular season
+PLAYOFF_WEEKS = (6, 7)
+
+def season_phase(week):
+    return "playoff" if week in PLAYOFF_WEEKS else "regular"
+
+def stat_values(row):
+    """Stat columns of a stat line (ORM object, result row or dict), with NULL as 0"""
+    if row is None:
+        return {field: 0 for field in TOTAL_FIELDS}
+    if isinstance(row, dict):
+        return {field: row.get(field) or 0 for field in TOTAL_FIELDS}
+    return {field: getattr(row, field) or 0 for field in TOTAL_FIELDS}
+
+def stat_delta(player_id, old, new):
+    """
+    Change to a player's totals when a stat line goes from `old` to `new`.
+    Either side may be None for a line that is absent or soft-deleted.
+    """
+    before, after = stat_values(old), stat_values(new)
+    delta = {field: after[field] - before[field] for field in TOTAL_FIELDS}
+    delta['games_played'] = (new is not None) - (old is not None)
+    delta['player_id'] = player_id
+    return delta
+
+def apply_totals_delta(db: Session, game, deltas):
+    """
+    Add stat deltas for one game to the players' season totals in the caller's
+    transaction. Stats of soft-deleted games are not counted.
+    """
+    deltas = [delta for delta in deltas if any(value for key, value in delta.items() if key != 'player_id')]
+    if not deltas or game.is_deleted:
+        return
+    season, phase = game.season, season_phase(game.week)
+    fields = ('games_played',) + TOTAL_FIELDS
+    insert_ = upsert_insert(db)
+    if insert_ is None:
+        _apply_totals_delta_orm(db, season, phase, deltas)
+        return
+    table = PlayerSeasonTotals.__table__
+    stmt = insert_(table).values([dict(delta, season=season, phase=phase) for delta in deltas])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['player_id', 'season', 'phase'],
+        set_={
+            **{field: table.c[field] + stmt.excluded[field] for field in fields},
+            'updated_at': func.now()
+        }
+    ))
+
+def _apply_totals_delta_orm(db: Session, season, phase, deltas):
+    """Fallback for dialects without ON CONFLICT: lock the rows, then add or insert"""
+    rows = {
+        row.player_id: row
+        for row in db.query(PlayerSeasonTotals).filter(
+            PlayerSeasonTotals.player_id.in_([delta['player_id'] for delta in deltas]),
+            PlayerSeasonTotals.season == season,
+            PlayerSeasonTotals.phase == phase
+        ).with_for_update()
+    }
+    for delta in deltas:
+        row = rows.get(delta['player_id'])
+        if row is None:
+            db.add(PlayerSeasonTotals(season=season, phase=phase, **delta))
+            continue
+        for field, value in delta.items():
+            if field != 'player_id':
+                setattr(row, field, getattr(row, field) + value)
+    db.flush()
+
+def totals_source_query():
+    """Season totals aggregated from live stat lines of live games"""
+    phase = case((Game.week.in_(PLAYOFF_WEEKS), "playoff"), else_="regular")
+    return select(
+        PlayerStats.player_id,
+        Game.season,
+        phase.label("phase"),
+        func.count(PlayerStats.id).label("games_played"),
+        *[func.coalesce(func.sum(getattr(PlayerStats, field)), 0).label(field) for field in TOTAL_FIELDS]
+    ).join(
+        Game, Game.id == PlayerStats.game_id
+    ).where(
+        PlayerStats.is_deleted == False,
+        Game.is_deleted == False
+    ).group_by(PlayerStats.player_id, Game.season, phase)
+
+def rebuild_season_totals(db: Session, player_ids=None):
+    """
+    Recompute season totals from player_stats in two set-based statements,
+    for every player or only `player_ids`. Used for repair and whenever a game's
+    season, week or deletion moves its stat lines between totals rows.
+    """
+    source = totals_source_query()
+    clear = delete(PlayerSeasonTotals)
+    if player_ids is not None:
+        player_ids = list(player_ids)
+        if not player_ids:
+            return 0
+        source = source.where(PlayerStats.player_id.in_(player_ids))
+        clear = clear.where(PlayerSeasonTotals.player_id.in_(player_ids))
+    db.execute(clear)
+    columns = ['player_id', 'season', 'phase', 'games_played', *TOTAL_FIELDS]
+    return db.execute(insert(PlayerSeasonTotals).from_select(columns, source)).rowcount
+
+def rebuild_game_totals(db: Session, game_id: int):
+    """Recompute totals for every player with a stat line in a game"""
+    player_ids = db.scalars(
+        select(PlayerStats.player_id).where(PlayerStats.game_id == game_id).distinct()
+    ).all()
+    return rebuild_season_totals(db, player_ids)
@@ -0,0 +1,69 @@
+import functools
+import os
+import random
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from database.database import _env_bool, _env_int
+
+
+def production_profile_enabled():
+    return _env_bool('SQLITE_PRODUCTION_PROFILE', False)
+
+def get_profile_pragmas():
+    """PRAGMAs applied to every new SQLite connection when the production profile is on"""
+    return {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        # Negative cache_size is in KiB rather than pages
+        'cache_size': -_env_int('SQLITE_CACHE_SIZE_KB', 64000),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', 268435456),
+    }
+
+def install_production_profile(engine):
+    """Register a connect hook that tunes each pooled SQLite connection"""
+    pragmas = get_profile_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+def is_locked_error(exc):
+    return isinstance(exc, OperationalError) and "database is locked" in str(exc.orig)
+
+def retry_on_locked(func):
+    """
+    Retry a write endpoint with exponential backoff when SQLite reports
+    'database is locked'. The request's session (the `db` argument) is
+    rolled back before each new attempt.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        retries = _env_int('DB_LOCK_RETRIES', 3)
+        delay = _env_int('DB_LOCK_RETRY_DELAY_MS', 50) / 1000
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                db = kwargs.get('db')
+                if db is not None:
+                    db.rollback()
+                if not is_locked_error(e):
+                    raise
+                if attempt >= retries:
+                    raise HTTPException(status_code=503, detail="Database is busy. Please try again.")
+                time.sleep(delay * (2 ** attempt) * (1 + random.random()))
+                attempt += 1
+    return wrapper
@@ -0,0 +1,207 @@
+from sqlalchemy import bindparam, case, delete, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.orm import Session
+
+from database.database import upsert_insert
+from models.game import Game
+from models.team import Team
+from models.team_matchup import TeamMatchup
+
+RECORD_FIELDS = ('wins', 'losses', 'ties')
+
+# Summed into each team_matchups row
+MATCHUP_FIELDS = ('games',) + RECORD_FIELDS + ('points_for', 'points_against')
+
+# Game columns that decide which teams a game counts for and how
+RESULT_FIELDS = (
+    'league', 'season', 'team1_id', 'team2_id', 'team1_score', 'team2_score',
+    'winning_team_id', 'completed', 'is_deleted',
+)
+
+def game_state(game):
+    """Snapshot of the result columns of a game, taken before and after a write"""
+    return {field: getattr(game, field) for field in RESULT_FIELDS}
+
+def _side_result(state, team_id, own_score, other_score):
+    # The recorded winner decides; without one the score does, and equal scores tie
+    winner = state['winning_team_id']
+    if winner is not None:
+        return 'wins' if winner == team_id else 'losses'
+    if own_score == other_score:
+        return 'ties'
+    return 'wins' if own_score > other_score else 'losses'
+
+def game_results(state):
+    """{team_id: 'wins' | 'losses' | 'ties'} for a completed, live game, else {}"""
+    if not state or not state['completed'] or state['is_deleted']:
+        return {}
+    score1, score2 = state['team1_score'] or 0, state['team2_score'] or 0
+    results = {}
+    if state['team1_id'] is not None:
+        results[state['team1_id']] = _side_result(state, state['team1_id'], score1, score2)
+    if state['team2_id'] is not None:
+        results[state['team2_id']] = _side_result(state, state['team2_id'], score2, score1)
+    return results
+
+def record_delta(old, new):
+    """Per-team W/L/T change when a game goes from state `old` to state `new`"""
+    deltas = {}
+    for sign, state in ((-1, old), (1, new)):
+        for team_id, result in game_results(state).items():
+            delta = deltas.setdefault(team_id, dict.fromkeys(RECORD_FIELDS, 0))
+            delta[result] += sign
+    return {team_id: delta for team_id, delta in deltas.items() if any(delta.values())}
+
+def matchup_delta(old, new):
+    """
+    Per-(team, opponent) change to the head-to-head rows when a game goes from
+    state `old` to state `new`. Games with a missing team have no matchup.
+    """
+    deltas = {}
+    for sign, state in ((-1, old), (1, new)):
+        results = game_results(state)
+        if len(results) < 2:
+            continue
+        scores = {state['team1_id']: state['team1_score'] or 0, state['team2_id']: state['team2_score'] or 0}
+        for team_id, opponent_id in ((state['team1_id'], state['team2_id']), (state['team2_id'], state['team1_id'])):
+            delta = deltas.setdefault((team_id, opponent_id), dict.fromkeys(MATCHUP_FIELDS, 0))
+            delta.update(team_id=team_id, opponent_id=opponent_id, league=state['league'], season=state['season'])
+            delta['games'] += sign
+            delta[results[team_id]] += sign
+            delta['points_for'] += sign * scores[team_id]
+            delta['points_against'] += sign * scores[opponent_id]
+    return [delta for delta in deltas.values() if any(delta[field] for field in MATCHUP_FIELDS)]
+
+def apply_record_delta(db: Session, old, new):
+    """
+    Add the result change of one game write to both teams' W/L/T records
+    (bumping their versions) and to their head-to-head rows, in the caller's
+    transaction. Returns the number of teams whose record changed.
+    """
+    _apply_matchup_delta(db, matchup_delta(old, new))
+    deltas = record_delta(old, new)
+    if not deltas:
+        return 0
+    teams = Team.__table__
+    statement = update(teams).where(teams.c.id == bindparam('team_id')).values(
+        version=teams.c.version + 1,
+        **{field: func.coalesce(teams.c[field], 0) + bindparam(f'delta_{field}') for field in RECORD_FIELDS}
+    )
+    db.execute(statement, [
+        {'team_id': team_id, **{f'delta_{field}': delta[field] for field in RECORD_FIELDS}}
+        for team_id, delta in deltas.items()
+    ])
+    return len(deltas)
+
+def _apply_matchup_delta(db: Session, deltas):
+    if not deltas:
+        return
+    insert_ = upsert_insert(db)
+    if insert_ is None:
+        _apply_matchup_delta_orm(db, deltas)
+        return
+    table = TeamMatchup.__table__
+    stmt = insert_(table).values(deltas)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['team_id', 'opponent_id'],
+        set_={
+            **{field: table.c[field] + stmt.excluded[field] for field in MATCHUP_FIELDS},
+            'league': stmt.excluded.league,
+            'season': stmt.excluded.season,
+            'updated_at': func.now()
+        }
+    ))
+
+def _apply_matchup_delta_orm(db: Session, deltas):
+    """Fallback for dialects without ON CONFLICT: lock the rows, then add or insert"""
+    for delta in deltas:
+        row = db.query(TeamMatchup).filter(
+            TeamMatchup.team_id == delta['team_id'],
+            TeamMatchup.opponent_id == delta['opponent_id']
+        ).with_for_update().first()
+        if row is None:
+            db.add(TeamMatchup(**delta))
+            continue
+        for field in MATCHUP_FIELDS:
+            setattr(row, field, getattr(row, field) + delta[field])
+        row.league, row.season = delta['league'], delta['season']
+    db.flush()
+
+def _sides_query(season=None):
+    """
+    One row per team per completed, live game: (team_id, opponent_id, league,
+    season, result, points_for, points_against)
+    """
+    sides = []
+    for team_id, opponent_id, own, other in (
+        (Game.team1_id, Game.team2_id, Game.team1_score, Game.team2_score),
+        (Game.team2_id, Game.team1_id, Game.team2_score, Game.team1_score),
+    ):
+        own, other = func.coalesce(own, 0), func.coalesce(other, 0)
+        result = case(
+            (Game.winning_team_id == team_id, literal('wins')),
+            (Game.winning_team_id.isnot(None), literal('losses')),
+            (own == other, literal('ties')),
+            (own > other, literal('wins')),
+            else_=literal('losses')
+        )
+        query = select(
+            team_id.label('team_id'),
+            opponent_id.label('opponent_id'),
+            Game.league,
+            Game.season,
+            result.label('result'),
+            own.label('points_for'),
+            other.label('points_against')
+        ).where(
+            Game.completed == True,
+            Game.is_deleted == False,
+            team_id.isnot(None)
+        )
+        if season is not None:
+            query = query.where(Game.season == season)
+        sides.append(query)
+    return union_all(*sides).subquery('sides')
+
+def reconcile_team_records(db: Session, season=None):
+    """
+    Recompute wins/losses/ties of every team in `season` (all seasons if None)
+    from its games in one UPDATE. Only teams whose record changes are written,
+    and their versions are bumped. Returns the number of teams corrected.
+    """
+    teams = Team.__table__
+    sides = _sides_query(season)
+    counts = {
+        field: select(func.count()).select_from(sides).where(
+            sides.c.team_id == teams.c.id, sides.c.result == field
+        ).scalar_subquery()
+        for field in RECORD_FIELDS
+    }
+    statement = update(teams).values(version=teams.c.version + 1, **counts).where(
+        or_(*[func.coalesce(teams.c[field], -1) != counts[field] for field in RECORD_FIELDS])
+    )
+    if season is not None:
+        statement = statement.where(teams.c.season == season)
+    return db.execute(statement).rowcount
+
+def rebuild_matchups(db: Session, season=None):
+    """
+    Recompute the head-to-head rows of `season` (all seasons if None) from games
+    in two set-based statements. Returns the number of rows written.
+    """
+    sides = _sides_query(season)
+    source = select(
+        sides.c.team_id,
+        sides.c.opponent_id,
+        func.max(sides.c.league),
+        func.max(sides.c.season),
+        func.count(),
+        *[func.sum(case((sides.c.result == field, 1), else_=0)) for field in RECORD_FIELDS],
+        func.sum(sides.c.points_for),
+        func.sum(sides.c.points_against)
+    ).where(sides.c.opponent_id.isnot(None)).group_by(sides.c.team_id, sides.c.opponent_id)
+    clear = delete(TeamMatchup)
+    if season is not None:
+        clear = clear.where(TeamMatchup.season == season)
+    db.execute(clear)
+    columns = ['team_id', 'opponent_id', 'league', 'season', *MATCHUP_FIELDS]
+    return db.execute(insert(TeamMatchup).from_select(columns, source)).rowcount
@@ -0,0 +1,55 @@
+"""
+Export player stats joined with player, game and team attributes to Parquet.
+
+Writes one file per season under OUT_DIR/season=<season>/ (a Hive-style
+partitioned dataset readable by pandas, pyarrow, DuckDB or Spark). Each season
+is read from a server-side cursor in batches, so memory stays flat however many
+seasons are exported. Requires pyarrow.
+
+    python export_parquet.py OUT_DIR [--season 2024 --season 2025] [--batch-size 10000]
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import select
+
+DEFAULT_BATCH_SIZE = 10000
+
+def main():
+    parser = argparse.ArgumentParser(description="Export player stats to a Parquet dataset partitioned by season")
+    parser.add_argument('out_dir')
+    parser.add_argument('--season', type=int, action='append', help="Season to export (repeatable; default all)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from database.arrow_export import arrow_available, arrow_schema, write_parquet
+    if not arrow_available():
+        print("Parquet export requires pyarrow (pip install pyarrow)")
+        return 1
+
+    from database.database import get_sessionmaker
+    from models.game import Game
+    from models.person import Person  # noqa: F401  target of Player.person
+    from routers.stats import batch_stats_query
+
+    db = get_sessionmaker()()
+    try:
+        seasons = args.season or db.scalars(
+            select(Game.season).where(Game.is_deleted == False, Game.season.isnot(None)).distinct().order_by(Game.season)
+        ).all()
+        total = 0
+        for season in seasons:
+            query = batch_stats_query(season=season)
+            result = db.execute(query.execution_options(yield_per=args.batch_size))
+            path = os.path.join(args.out_dir, f"season={season}", "part-0.parquet")
+            rows = write_parquet(result, arrow_schema(query), path)
+            total += rows
+            print(f"Season {season}: {rows} rows -> {path}")
+        print(f"Exported {total} rows for {len(seasons)} seasons")
+    finally:
+        db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
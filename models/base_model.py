@@ -1,7 +1,20 @@
-from sqlalchemy import Column, Integer, DateTime, Boolean
+from sqlalchemy import Column, Integer, DateTime, Boolean, Index, text
 from sqlalchemy.sql import func
 from database.database import Base
 
+
+def active_index(name, *columns):
+    """
+    Composite index restricted to rows that are not soft-deleted on dialects
+    that support partial indexes, and a plain composite index elsewhere.
+    """
+    return Index(
+        name,
+        *columns,
+        sqlite_where=text("is_deleted = 0"),
+        postgresql_where=text("is_deleted = false")
+    )
+
 class BaseModel(Base):
     __abstract__ = True
     
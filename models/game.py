@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
 from sqlalchemy.orm import relationship
-from models.base_model import BaseModel
+from models.base_model import BaseModel, active_index
 
 
 class Game(BaseModel):
@@ -20,4 +20,8 @@ class Game(BaseModel):
     team1 = relationship("Team", foreign_keys=[team1_id])
     team2 = relationship("Team", foreign_keys=[team2_id])
     winning_team = relationship("Team", foreign_keys=[winning_team_id])
-    stats = relationship("PlayerStats", back_populates="game", cascade="all, delete-orphan")
\ No newline at end of file
+    stats = relationship("PlayerStats", back_populates="game", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        active_index('ix_games_season_week_active', 'season', 'week'),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import relationship
+from models.base_model import BaseModel
+
+
+class Person(BaseModel):
+    """
+    A player's identity across seasons. Each season's roster entry is its own
+    players row; rows for the same person share a person_id.
+    """
+    __tablename__ = "people"
+    id = Column(Integer, primary_key=True, index=True, nullable=False, autoincrement=True)
+    name = Column(String, index=True)
+
+    players = relationship("Player", back_populates="person")
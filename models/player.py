@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
-from models.base_model import BaseModel
+from models.base_model import BaseModel, active_index
 
 
 class Player(BaseModel):
@@ -8,14 +8,21 @@ class Player(BaseModel):
     id = Column(Integer, primary_key=True, index=True, nullable=False, autoincrement=True)
     name = Column(String, index=True)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"))
+    person_id = Column(Integer, ForeignKey("people.id", ondelete="SET NULL"), nullable=True)  # Same person across seasons
     season = Column(Integer, index=True)  # Track which season this roster entry is for
     is_active = Column(Boolean, default=True)  # Track if player is currently active
     jersey_number = Column(String, nullable=True)  # Optional jersey number
     
     # Define relationships
     team = relationship("Team", back_populates="players")
+    person = relationship("Person", back_populates="players")
     stats = relationship("PlayerStats", back_populates="player", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        active_index('ix_players_name_season_active', 'name', 'season', 'is_active'),
+        Index('ix_players_person_season', 'person_id', 'season'),
+    )
+
     @property
     def display_name(self):
         """Return a formatted display name including jersey number if available"""
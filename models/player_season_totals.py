@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database.database import Base
+
+
+# Stat columns summed into each totals row
+TOTAL_FIELDS = (
+    'passing_tds', 'passes_completed', 'passes_attempted', 'interceptions_thrown', 'qb_rushing_tds',
+    'receptions', 'targets', 'receiving_tds', 'drops', 'first_downs',
+    'rushing_tds', 'rush_attempts',
+    'flag_pulls', 'interceptions', 'pass_breakups', 'def_td', 'sacks',
+)
+
+class PlayerSeasonTotals(Base):
+    """
+    Running sums of a player's live stat lines per season and phase
+    (regular/playoff), maintained by delta on every stat write.
+    """
+    __tablename__ = "player_season_totals"
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    season = Column(Integer, primary_key=True)
+    phase = Column(String, primary_key=True)
+    games_played = Column(Integer, default=0, nullable=False)
+
+    # qb
+    passing_tds = Column(Integer, default=0, nullable=False)
+    passes_completed = Column(Integer, default=0, nullable=False)
+    passes_attempted = Column(Integer, default=0, nullable=False)
+    interceptions_thrown = Column(Integer, default=0, nullable=False)
+    qb_rushing_tds = Column(Integer, default=0, nullable=False)
+
+    # wr
+    receptions = Column(Integer, default=0, nullable=False)
+    targets = Column(Integer, default=0, nullable=False)
+    receiving_tds = Column(Integer, default=0, nullable=False)
+    drops = Column(Integer, default=0, nullable=False)
+    first_downs = Column(Integer, default=0, nullable=False)
+
+    # rb
+    rushing_tds = Column(Integer, default=0, nullable=False)
+    rush_attempts = Column(Integer, default=0, nullable=False)
+
+    # defense
+    flag_pulls = Column(Integer, default=0, nullable=False)
+    interceptions = Column(Integer, default=0, nullable=False)
+    pass_breakups = Column(Integer, default=0, nullable=False)
+    def_td = Column(Integer, default=0, nullable=False)
+    sacks = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
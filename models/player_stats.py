@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from models.base_model import BaseModel
+from models.base_model import BaseModel, active_index
 
 
 class PlayerStats(BaseModel):
@@ -40,3 +40,9 @@ class PlayerStats(BaseModel):
     player = relationship("Player", back_populates="stats")
     game = relationship("Game", back_populates="stats")
 
+    __table_args__ = (
+        # One stat line per player per game; also the conflict target for upserts
+        Index('uq_player_stats_player_game', 'player_id', 'game_id', unique=True),
+        active_index('ix_player_stats_game_active', 'game_id'),
+    )
+
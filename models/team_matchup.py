@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from database.database import Base
+
+
+class TeamMatchup(Base):
+    """
+    Head-to-head record and points of one team against one opponent over their
+    completed games, maintained by delta whenever a game result changes. Each
+    pair is stored in both directions.
+    """
+    __tablename__ = "team_matchups"
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    opponent_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
+    league = Column(String)
+    season = Column(Integer)
+
+    games = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    losses = Column(Integer, default=0, nullable=False)
+    ties = Column(Integer, default=0, nullable=False)
+    points_for = Column(Integer, default=0, nullable=False)
+    points_against = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_team_matchups_season_league', 'season', 'league'),
+    )
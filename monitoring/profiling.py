@@ -0,0 +1,144 @@
+import hmac
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+def profiling_token():
+    """Admin token that enables on-demand request profiling (PROFILING_TOKEN, unset = off)"""
+    return os.getenv('PROFILING_TOKEN') or None
+
+def profile_dir():
+    return os.getenv('PROFILE_DIR', 'profiles')
+
+# Frames where a thread is parked rather than doing work for the request
+_IDLE_FILES = ('selectors.py', 'threading.py', 'queue.py')
+
+# Idents of the threads doing work for the request being profiled (None outside
+# one). The set is shared with the threadpool through the copied context.
+_profiled_threads = ContextVar('profiled_threads', default=None)
+
+def mark_profiled_thread(*args):
+    """
+    Attribute the calling thread to the request being profiled, if any. Installed
+    as a before_cursor_execute hook, so a sync endpoint's threadpool thread is
+    registered by its first statement.
+    """
+    threads = _profiled_threads.get()
+    if threads is not None:
+        threads.add(threading.get_ident())
+
+class StackSampler:
+    """
+    Sample the Python stacks of all running threads at a fixed interval and
+    aggregate them as folded stacks (the input format of flamegraph.pl and
+    speedscope). Samples are kept per thread; when `threads` is given, only the
+    threads in it by the time the stacks are read are reported, so other
+    requests running in the threadpool do not end up in the profile.
+    """
+
+    def __init__(self, interval=0.001, threads=None):
+        self.interval = interval
+        self.threads = threads
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[(thread_id, ";".join(reversed(stack)))] += 1
+
+    def folded(self):
+        return "".join(
+            f"{stack} {count}\n"
+            for (thread_id, stack), count in self.stacks.most_common()
+            if self.threads is None or thread_id in self.threads
+        )
+
+class ProfilingMiddleware:
+    """
+    Profile individual requests on demand. A request is profiled when it sends
+    `X-Profile: 1` (or `?profile=1`) together with an `X-Profile-Token` header
+    matching PROFILING_TOKEN. The folded-stack artifact is written to
+    `artifact_dir` and its file name returned in the X-Profile-Artifact header.
+    Only one request is profiled at a time; others are served normally. The
+    artifact holds the event loop thread and the threadpool threads that ran
+    SQL for the request (see mark_profiled_thread).
+    """
+
+    def __init__(self, app, token, artifact_dir="profiles", interval=0.001):
+        self.app = app
+        self.token = token.encode()
+        self.artifact_dir = artifact_dir
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def _requested(self, scope):
+        headers = dict(scope.get("headers") or [])
+        flag = headers.get(b"x-profile")
+        if flag is None:
+            flag = parse_qs(scope.get("query_string", b"").decode()).get("profile", [""])[0].encode()
+        if flag.lower() not in (b"1", b"true", b"yes"):
+            return False
+        return hmac.compare_digest(headers.get(b"x-profile-token", b""), self.token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope) or not self._lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}"
+        name = f"{stamp}-{next(self._sequence)}-{scope['method'].lower()}-{path}.folded"
+        threads = {threading.get_ident()}
+        sampler = StackSampler(self.interval, threads)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-artifact", name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _profiled_threads.set(threads)
+        try:
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                sampler.stop()
+                _profiled_threads.reset(token)
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            with open(os.path.join(self.artifact_dir, name), "w") as f:
+                f.write(sampler.folded())
+        finally:
+            self._lock.release()
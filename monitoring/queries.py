@@ -0,0 +1,94 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger(__name__)
+
+# Statistics for the request currently being served (None outside a request)
+_current_stats = ContextVar('db_query_stats', default=None)
+
+class QueryStats:
+    """SQL statements issued while serving one request"""
+    __slots__ = ('count', 'duration', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        # Parameters are bound separately, so the SQL text is the statement shape
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold):
+        """Statement shapes executed more than `threshold` times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+def current_query_stats():
+    return _current_stats.get()
+
+def install_query_hooks(engine, observers=()):
+    """
+    Time every statement on this engine and attribute it to the current request.
+    Each observer is also called with (statement, elapsed_seconds).
+    """
+    observers = tuple(observers)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        for observer in observers:
+            observer(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_start_time'):
+            conn.info['query_start_time'].pop()
+
+    return engine
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Count and time the SQL issued by each request, report it in the
+    X-DB-Queries and Server-Timing response headers, and warn when one
+    statement shape repeats more than `repeat_threshold` times (likely N+1).
+    """
+
+    def __init__(self, app, repeat_threshold=10):
+        super().__init__(app)
+        self.repeat_threshold = repeat_threshold
+
+    async def dispatch(self, request, call_next):
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        response.headers['X-DB-Queries'] = str(stats.count)
+        timing = f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'
+        if 'server-timing' in response.headers:
+            timing = f"{response.headers['server-timing']}, {timing}"
+        response.headers['Server-Timing'] = timing
+
+        for shape, count in stats.repeated(self.repeat_threshold):
+            logger.warning(
+                "Possible N+1: %s %s ran the same statement %d times: %s",
+                request.method, request.url.path, count, " ".join(shape.split())[:200]
+            )
+        return response
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select
+from typing import List, Optional
+
+from database.async_database import get_async_db
+from models.game import Game
+from routers.stats import batch_stats_etag_query, batch_stats_query, stream_stats_export
+from routers.game import GAME_ORDER, build_game_out, game_key, games_etag_query, games_keys_query
+from routers.team import team_list_item, teams_etag_query, teams_list_query
+from routers.conditional import collection_etag_async, not_modified
+from routers.pagination import paginate, set_next_cursor
+from routers.fast_json import json_response, rows_to_dicts
+from schemas.player_stats import PlayerStatsOut
+from schemas.games import GameOut
+from schemas.teams import TeamOut
+
+# Async variants of the read-heavy list endpoints. app.py includes this router
+# ahead of the sync routers when ASYNC_READS is enabled, so these take over the
+# same paths and keep the same response shapes.
+router = APIRouter(tags=["async reads"])
+
+@router.get("/stats/batch/", response_model=List[PlayerStatsOut])
+async def get_stats_batch_async(
+    request: Request,
+    response: Response,
+    week: int = None,
+    season: int = None,
+    game_id: int = None,
+    format: str = Query("json", pattern="^(json|ndjson|csv|arrow)$"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Streamed exports read from the sync engine in the threadpool
+    if format != "json":
+        return stream_stats_export(batch_stats_query(week, season, game_id, require_filter=False), format)
+    query = batch_stats_query(week, season, game_id)
+    etag = await collection_etag_async(db, batch_stats_etag_query(week, season, game_id))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    return json_response(rows_to_dicts(await db.execute(query)), response)
+
+@router.get("/games/", response_model=List[GameOut])
+async def get_games_async(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    etag = await collection_etag_async(db, games_etag_query(skip, limit, include_deleted, cursor))
+    cached = not_modified(request, response, etag)
+    if cached:
+        # A revalidated page still needs its next cursor for the client to advance
+        keys = (await db.execute(games_keys_query(skip, limit, include_deleted, cursor))).all()
+        set_next_cursor(cached, keys, limit)
+        return cached
+    query = select(Game)
+    if not include_deleted:
+        query = query.filter(Game.is_deleted == False)
+    query = paginate(query.options(
+        joinedload(Game.team1),
+        joinedload(Game.team2),
+        joinedload(Game.winning_team)
+    ), GAME_ORDER, skip, limit, cursor)
+    games = (await db.execute(query)).scalars().all()
+    set_next_cursor(response, [game_key(game) for game in games], limit)
+    return [build_game_out(game) for game in games]
+
+@router.get("/teams/", response_model=List[TeamOut])
+async def get_teams_async(request: Request, response: Response, skip: int = 0, limit: int = 100, include_deleted: bool = False, db: AsyncSession = Depends(get_async_db)):
+    etag = await collection_etag_async(db, teams_etag_query(skip, limit, include_deleted))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    teams = rows_to_dicts(await db.execute(teams_list_query(skip, limit, include_deleted)))
+    return json_response([team_list_item(team) for team in teams], response)
@@ -0,0 +1,56 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+
+# Conditional GET support for list endpoints. Each listing pairs its row query
+# with a fingerprint query over the same joins, filters and page; the aggregate
+# of that fingerprint is hashed into a strong ETag, so an unchanged collection
+# is answered with 304 after one aggregate query and no row serialization.
+
+def fingerprint(*entities):
+    """id, version and updated_at of each entity, labelled for etag_query()"""
+    columns = []
+    for index, entity in enumerate(entities):
+        columns.extend([
+            entity.id.label(f"id_{index}"),
+            entity.version.label(f"version_{index}"),
+            entity.updated_at.label(f"updated_at_{index}"),
+        ])
+    return columns
+
+def etag_query(rows):
+    """
+    Collapse a fingerprint select into one row: row count, sums of ids and
+    versions, and the latest updated_at of each entity. Any insert, update,
+    soft delete or restore in the set changes at least one of these.
+    """
+    page = rows.subquery()
+    aggregates = [func.count()]
+    for column in page.c:
+        aggregates.append(func.max(column) if column.name.startswith("updated_at_") else func.sum(column))
+    return select(*aggregates)
+
+def make_etag(row):
+    return '"' + hashlib.sha1(repr(tuple(row)).encode()).hexdigest() + '"'
+
+def collection_etag(db, rows):
+    return make_etag(db.execute(etag_query(rows)).one())
+
+async def collection_etag_async(db, rows):
+    return make_etag((await db.execute(etag_query(rows))).one())
+
+def etag_matches(if_none_match: Optional[str], etag: str):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+def not_modified(request: Request, response: Response, etag: str):
+    """Set the ETag on the response; return a 304 response if the client's copy is current"""
+    response.headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -0,0 +1,43 @@
+import json
+from datetime import datetime
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fast path for large list responses: endpoints select plain column tuples with
+# Core, turn them into dicts and encode them straight to JSON bytes here, instead
+# of hydrating ORM objects, building Pydantic models and having FastAPI validate
+# and serialize them again against response_model. The output matches what the
+# Pydantic models would produce. orjson is used when installed.
+
+def _default(value):
+    if isinstance(value, datetime):
+        return _isoformat(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _isoformat(value):
+    # Same form as Pydantic: UTC offsets are written as Z
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+def json_response(content, response: Response):
+    """JSON response for `content`, keeping headers already set on the injected response (ETag, cursor)"""
+    headers = {
+        key: value for key, value in response.headers.items()
+        if key not in ("content-length", "content-type")
+    }
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
+
+def rows_to_dicts(result):
+    """Plain dicts for every row of a Core result, keyed by the selected labels"""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
@@ -1,20 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session, joinedload, aliased
+from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.exc import OperationalError
 
 from database.database import get_db
+from database.sqlite_profile import retry_on_locked
+from database.season_totals import apply_totals_delta, rebuild_game_totals, stat_delta
+from database.team_records import apply_record_delta, game_state
+from database.aggregate_cache import invalidate_seasons, get_final_boxscore, store_final_boxscore, forget_final_boxscores
+from routers.conditional import collection_etag, fingerprint, not_modified
+from routers.pagination import paginate, set_next_cursor
 from models.game import Game
 from models.team import Team
-from schemas.games import GameCreate, GameOut, GameUpdate, GameResponse
+from models.player_stats import PlayerStats
+from models.player import Player
+from schemas.games import GameCreate, GameOut, GameUpdate, GameResponse, BoxScore, BoxScoreLine, BoxScoreSide, BoxScoreResponse
+from schemas.player_stats import PlayerStatsBulkCreate, PlayerStatsBulkResponse, PlayerStatsOut
+from routers.stats import live_stat_lines, resolve_season_players, upsert_stats_many
+from routers.leaders import CATEGORIES, DERIVED
 
 router = APIRouter(
     prefix="/games",
     tags=["games"]
 )
 
+def build_game_out(game):
+    """Build GameOut from a Game row with its team relationships loaded"""
+    return GameOut(
+        id=game.id,
+        week=game.week,
+        league=game.league,
+        season=game.season,
+        team1_id=game.team1_id,
+        team1_name=game.team1.name if game.team1 else None,
+        team1_score=game.team1_score,
+        team2_id=game.team2_id,
+        team2_name=game.team2.name if game.team2 else None,
+        team2_score=game.team2_score,
+        winning_team_id=game.winning_team_id,
+        winning_team_name=game.winning_team.name if game.winning_team else None,
+        completed=game.completed,
+        version=game.version,
+        created_at=game.created_at,
+        updated_at=game.updated_at,
+        is_deleted=game.is_deleted,
+        deleted_at=game.deleted_at
+    )
+
 @router.post("/", response_model=GameResponse)
+@retry_on_locked
 def create_game(game: GameCreate, db: Session = Depends(get_db)):
     try:
         # Find teams by name
@@ -89,7 +125,10 @@ def create_game(game: GameCreate, db: Session = Depends(get_db)):
         try:
             db.add(db_game)
             db.commit()
+            invalidate_seasons(game.season)
             db.refresh(db_game)
+        except OperationalError:
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to create game: {str(e)}")
@@ -121,47 +160,71 @@ def create_game(game: GameCreate, db: Session = Depends(get_db)):
             message="Game created successfully"
         )
         
-    except HTTPException:
+    except (HTTPException, OperationalError):
         db.rollback()
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
+# Listing order and cursor key for games
+GAME_ORDER = (Game.season, Game.week, Game.id)
+
+def game_key(game):
+    return (game.season, game.week, game.id)
+
+def games_etag_query(skip: int, limit: int, include_deleted: bool, cursor: Optional[str] = None):
+    """ETag fingerprint of a games page, including the teams whose names it shows"""
+    team1, team2, winning_team = aliased(Team), aliased(Team), aliased(Team)
+    query = select(*fingerprint(Game, team1, team2, winning_team)).select_from(Game).outerjoin(
+        team1, team1.id == Game.team1_id
+    ).outerjoin(
+        team2, team2.id == Game.team2_id
+    ).outerjoin(
+        winning_team, winning_team.id == Game.winning_team_id
+    )
+    if not include_deleted:
+        query = query.where(Game.is_deleted == False)
+    return paginate(query, GAME_ORDER, skip, limit, cursor)
+
+def games_keys_query(skip: int, limit: int, include_deleted: bool, cursor: Optional[str] = None):
+    """Sort keys of a games page, to advertise its next cursor on a 304"""
+    query = select(*GAME_ORDER)
+    if not include_deleted:
+        query = query.where(Game.is_deleted == False)
+    return paginate(query, GAME_ORDER, skip, limit, cursor)
+
 @router.get("/", response_model=List[GameOut])
-def get_games(skip: int = 0, limit: int = 100, include_deleted: bool = False, db: Session = Depends(get_db)):
+def get_games(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Games ordered by season, week and id. Pass the X-Next-Cursor response header
+    back as `cursor` to fetch the next page; `skip` is ignored when a cursor is given.
+    """
+    etag = collection_etag(db, games_etag_query(skip, limit, include_deleted, cursor))
+    cached = not_modified(request, response, etag)
+    if cached:
+        # A revalidated page still needs its next cursor for the client to advance
+        set_next_cursor(cached, db.execute(games_keys_query(skip, limit, include_deleted, cursor)).all(), limit)
+        return cached
     query = db.query(Game)
     if not include_deleted:
         query = query.filter(Game.is_deleted == False)
-    games = query.options(
+    games = paginate(query.options(
         joinedload(Game.team1),
         joinedload(Game.team2),
         joinedload(Game.winning_team)
-    ).offset(skip).limit(limit).all()
+    ), GAME_ORDER, skip, limit, cursor).all()
+    set_next_cursor(response, [game_key(game) for game in games], limit)
     
-    # Create response with all required fields
-    return [
-        GameOut(
-            id=game.id,
-            week=game.week,
-            league=game.league,
-            season=game.season,
-            team1_id=game.team1_id,
-            team1_name=game.team1.name if game.team1 else None,
-            team1_score=game.team1_score,
-            team2_id=game.team2_id,
-            team2_name=game.team2.name if game.team2 else None,
-            team2_score=game.team2_score,
-            winning_team_id=game.winning_team_id,
-            winning_team_name=game.winning_team.name if game.winning_team else None,
-            completed=game.completed,
-            version=game.version,
-            created_at=game.created_at,
-            updated_at=game.updated_at,
-            is_deleted=game.is_deleted,
-            deleted_at=game.deleted_at
-        ) for game in games
-    ]
+    return [build_game_out(game) for game in games]
 
 @router.get("/{game_id}", response_model=GameResponse)
 def get_game(game_id: int, include_deleted: bool = False, db: Session = Depends(get_db)):
@@ -184,13 +247,15 @@ def get_game(game_id: int, include_deleted: bool = False, db: Session = Depends(
     )
 
 @router.put("/{game_id}", response_model=GameResponse)
+@retry_on_locked
 def update_game(game_id: int, game_update: GameUpdate, version: int, db: Session = Depends(get_db)):
+    # Locked so the version check and the result delta see the committed row
     db_game = db.query(Game).filter(
         and_(
             Game.id == game_id,
             Game.is_deleted == False
         )
-    ).first()
+    ).with_for_update().first()
     
     if not db_game:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -230,10 +295,21 @@ def update_game(game_id: int, game_update: GameUpdate, version: int, db: Session
             update_data['winning_team_id'] = None
         del update_data['winning_team_name']
     
+    seasons = {db_game.season, update_data.get('season', db_game.season)}
+    # Moving a game to another season or week moves its stats between totals rows
+    moves_totals = any(key in update_data and update_data[key] != getattr(db_game, key) for key in ('season', 'week'))
+    before = game_state(db_game)
     for key, value in update_data.items():
         setattr(db_game, key, value)
+    # Re-scoring a completed game moves its result between the teams' records
+    apply_record_delta(db, before, game_state(db_game))
+    if moves_totals:
+        db.flush()
+        rebuild_game_totals(db, game_id)
     
     db.commit()
+    invalidate_seasons(*seasons)
+    forget_final_boxscores(game_id)
     db.refresh(db_game)
     
     return GameResponse(
@@ -243,13 +319,15 @@ def update_game(game_id: int, game_update: GameUpdate, version: int, db: Session
     )
 
 @router.delete("/{game_id}", response_model=GameResponse)
+@retry_on_locked
 def delete_game(game_id: int, version: int, db: Session = Depends(get_db)):
+    # Locked so the version check and the result delta see the committed row
     db_game = db.query(Game).filter(
         and_(
             Game.id == game_id,
             Game.is_deleted == False
         )
-    ).first()
+    ).with_for_update().first()
     
     if not db_game:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -259,11 +337,18 @@ def delete_game(game_id: int, version: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=409, detail="Record has been modified. Please refresh and try again.")
     
     # Soft delete
+    before = game_state(db_game)
     db_game.is_deleted = True
     db_game.deleted_at = datetime.utcnow()
     db_game.version += 1
+    apply_record_delta(db, before, game_state(db_game))
+    db.flush()
+    rebuild_game_totals(db, game_id)
+    season = db_game.season
     
     db.commit()
+    invalidate_seasons(season)
+    forget_final_boxscores(game_id)
     db.refresh(db_game)
     
     return GameResponse(
@@ -272,10 +357,197 @@ def delete_game(game_id: int, version: int, db: Session = Depends(get_db)):
     )
 
 @router.put("/{game_id}/complete")
+@retry_on_locked
 def mark_game_complete(game_id: int, db: Session = Depends(get_db)):
-    game = db.query(Game).filter(Game.id == game_id).first()
+    # Locked so concurrent calls cannot both see the game incomplete and count it twice
+    game = db.query(Game).filter(Game.id == game_id).with_for_update().first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    if game.completed:
+        return {"success": True, "message": "Game is already complete"}
+    before = game_state(game)
     game.completed = True
+    game.version += 1
+    # Count the result in both teams' records in the same transaction
+    apply_record_delta(db, before, game_state(game))
+    season = game.season
     db.commit()
-    return {"success": True, "message": "Game marked as complete"} 
\ No newline at end of file
+    invalidate_seasons(season)
+    # Cached from the next box score read on, since stats can no longer change
+    forget_final_boxscores(game_id)
+    return {"success": True, "message": "Game marked as complete"}
+
+def boxscore_query(game_id: int):
+    """
+    One grouped select over a game's live stat lines: per-player sums plus the
+    totals of the player's team (players.team_id) as window sums over the groups,
+    with the derived percentages for both.
+    """
+    player_sums, team_sums = {}, {}
+    for spec in CATEGORIES.values():
+        for column in spec["columns"]:
+            player_sums[column] = func.coalesce(func.sum(getattr(PlayerStats, column)), 0)
+            team_sums[column] = func.sum(player_sums[column]).over(partition_by=Player.team_id)
+    derived_player, derived_team = {}, {}
+    for builders in DERIVED.values():
+        for name, build in builders.items():
+            derived_player[name] = build(player_sums)
+            derived_team[name] = build(team_sums)
+    return select(
+        Player.team_id,
+        PlayerStats.player_id,
+        Player.name.label("player_name"),
+        *[value.label(name) for name, value in {**player_sums, **derived_player}.items()],
+        *[value.label(f"team_{name}") for name, value in {**team_sums, **derived_team}.items()]
+    ).join(
+        Player, Player.id == PlayerStats.player_id
+    ).where(
+        PlayerStats.game_id == game_id,
+        PlayerStats.is_deleted == False
+    ).group_by(Player.team_id, PlayerStats.player_id, Player.name).order_by(PlayerStats.player_id)
+
+def build_boxscore_side(team, score, rows):
+    """Team totals and per-category player lines for one side of a box score"""
+    stat_names = list(dict.fromkeys(
+        [column for spec in CATEGORIES.values() for column in spec["columns"]]
+        + [name for builders in DERIVED.values() for name in builders]
+    ))
+    totals = {name: getattr(rows[0], f"team_{name}") if rows else 0 for name in stat_names}
+    players = {}
+    for category, spec in CATEGORIES.items():
+        names = spec["columns"] + list(DERIVED.get(category, {}))
+        lines = [
+            BoxScoreLine(
+                player_id=row.player_id,
+                player_name=row.player_name or "",
+                stats={name: getattr(row, name) for name in names}
+            )
+            for row in rows
+            # Same rule as the leaderboards: list players who recorded something
+            if (getattr(row, spec["require"]) > 0 if "require" in spec else any(getattr(row, column) for column in spec["columns"]))
+        ]
+        lines.sort(key=lambda line: tuple(line.stats[key] for key in spec["sort"]), reverse=True)
+        players[category] = lines
+    return BoxScoreSide(
+        team_id=team.id if team else None,
+        team_name=team.name if team else "",
+        score=score or 0,
+        totals=totals,
+        players=players
+    )
+
+@router.get("/{game_id}/boxscore", response_model=BoxScoreResponse)
+def get_boxscore(game_id: int, db: Session = Depends(get_db)):
+    """
+    Team totals and per-player lines by category for both sides of a game.
+    Players are assigned to a side by their current team. Box scores of
+    completed games are computed once and then served from memory.
+    """
+    cached = get_final_boxscore(game_id)
+    if cached is not None:
+        return cached
+
+    game = db.query(Game).options(
+        joinedload(Game.team1),
+        joinedload(Game.team2)
+    ).filter(Game.id == game_id, Game.is_deleted == False).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    rows = db.execute(boxscore_query(game_id)).all()
+    sides = {}
+    for row in rows:
+        sides.setdefault(row.team_id, []).append(row)
+    response = BoxScoreResponse(
+        success=True,
+        data=BoxScore(
+            game_id=game.id,
+            season=game.season,
+            week=game.week,
+            league=game.league or "",
+            completed=bool(game.completed),
+            team1=build_boxscore_side(game.team1, game.team1_score, sides.get(game.team1_id, [])),
+            team2=build_boxscore_side(game.team2, game.team2_score, sides.get(game.team2_id, []))
+        )
+    )
+    if game.completed:
+        store_final_boxscore(game_id, response)
+    return response
+
+@router.post("/{game_id}/stats/bulk", response_model=PlayerStatsBulkResponse)
+@retry_on_locked
+def create_game_stats_bulk(game_id: int, sheet: PlayerStatsBulkCreate, db: Session = Depends(get_db)):
+    """
+    Save a whole stat sheet for a game in one transaction. Each submitted line
+    replaces that player's line for the game; players not listed are untouched.
+    """
+    try:
+        game = db.query(Game).options(
+            joinedload(Game.team1),
+            joinedload(Game.team2)
+        ).filter(Game.id == game_id, Game.is_deleted == False).first()
+        if not game:
+            raise HTTPException(status_code=404, detail=f"Game with id '{game_id}' not found")
+        if game.completed:
+            raise HTTPException(status_code=403, detail="Cannot edit stats for a completed game.")
+        if not sheet.stats:
+            raise HTTPException(status_code=400, detail="No stat lines submitted")
+
+        # Validate the whole sheet before writing anything
+        requested_ids = [line.player_id for line in sheet.stats]
+        duplicates = sorted({pid for pid in requested_ids if requested_ids.count(pid) > 1})
+        if duplicates:
+            raise HTTPException(status_code=400, detail=f"Duplicate stat lines for player ids {duplicates}")
+
+        resolved = resolve_season_players(db, set(requested_ids), game.season)
+        missing = [pid for pid in requested_ids if pid not in resolved]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No player record found in season {game.season} for player ids {missing}"
+            )
+        season_ids = [resolved[pid].id for pid in requested_ids]
+        if len(set(season_ids)) != len(season_ids):
+            raise HTTPException(status_code=400, detail="Several stat lines resolve to the same player")
+
+        # Capture response fields now; commit expires the loaded objects
+        player_names = {player.id: player.name for player in resolved.values()}
+        game_fields = dict(
+            game_week=game.week,
+            game_season=game.season,
+            league=game.league,
+            team1_name=game.team1.name if game.team1 else "",
+            team2_name=game.team2.name if game.team2 else ""
+        )
+
+        try:
+            previous = live_stat_lines(db, game.id, season_ids)
+            rows = upsert_stats_many(db, game.id, [(resolved[line.player_id].id, line) for line in sheet.stats])
+            apply_totals_delta(db, game, [stat_delta(row.player_id, previous.get(row.player_id), row) for row in rows])
+            db.commit()
+            invalidate_seasons(game_fields['game_season'])
+        except OperationalError:
+            raise
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to save stats: {str(e)}")
+
+        data = [
+            PlayerStatsOut(
+                **{column.key: getattr(row, column.key) for column in PlayerStats.__table__.c},
+                player_name=player_names[row.player_id],
+                **game_fields
+            )
+            for row in sorted(rows, key=lambda row: row.id)
+        ]
+        return PlayerStatsBulkResponse(
+            success=True,
+            data=data,
+            message=f"Saved {len(data)} stat lines"
+        )
+    except (HTTPException, OperationalError):
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import text
+
+from database.database import get_engine, get_pool_status
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"]
+)
+
+@router.get("/db")
+def db_health():
+    """
+    Check database connectivity and report connection pool usage.
+    """
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {str(e)}")
+    return {
+        "success": True,
+        "database": get_engine().url.get_backend_name(),
+        "pool": get_pool_status()
+    }
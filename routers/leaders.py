@@ -0,0 +1,163 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, literal, distinct
+from typing import Optional
+
+from database.database import get_db
+from models.player_stats import PlayerStats
+from models.player import Player
+from models.game import Game
+from models.player_season_totals import PlayerSeasonTotals
+from database.season_totals import PLAYOFF_WEEKS
+from database.aggregate_cache import get_aggregate_cache
+from schemas.player_stats import LeaderboardEntry, LeaderboardResponse
+
+# Included ahead of the stats router so /stats/leaders is not taken for /stats/{stats_id}
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"]
+)
+
+# Summed columns, default sort keys and the column that must be non-zero for a
+# player to be listed, per leaderboard category
+CATEGORIES = {
+    "passing": {
+        "columns": ["passes_completed", "passes_attempted", "passing_tds", "interceptions_thrown", "qb_rushing_tds"],
+        "sort": ["passing_tds", "qb_rushing_tds"],
+    },
+    "rushing": {
+        "columns": ["rush_attempts", "rushing_tds", "first_downs"],
+        "sort": ["rushing_tds"],
+        "require": "rush_attempts",
+    },
+    "receiving": {
+        "columns": ["receptions", "targets", "receiving_tds", "drops", "first_downs"],
+        "sort": ["receptions"],
+    },
+    "defense": {
+        "columns": ["interceptions", "sacks", "def_td", "flag_pulls", "pass_breakups"],
+        "sort": ["flag_pulls"],
+    },
+}
+
+# Derived columns computed in SQL from the summed ones
+DERIVED = {
+    "passing": {
+        "completion_pct": lambda sums: func.coalesce(
+            func.round(100.0 * sums["passes_completed"] / func.nullif(sums["passes_attempted"], 0), 1), 0
+        ),
+    },
+    "receiving": {
+        "catch_pct": lambda sums: func.coalesce(
+            func.round(100.0 * sums["receptions"] / func.nullif(sums["targets"], 0), 1), 0
+        ),
+    },
+}
+
+def phase_filter(phase: str):
+    """Game filter for a season phase: regular, playoff or all"""
+    if phase == "regular":
+        return Game.week.notin_(PLAYOFF_WEEKS)
+    if phase == "playoff":
+        return Game.week.in_(PLAYOFF_WEEKS)
+    return literal(True)
+
+def _stat_lines_source(season: int, phase: str, league: Optional[str]):
+    """Aggregate raw stat lines; needed when filtering on game fields such as league"""
+    query = select().select_from(PlayerStats).join(
+        Player, Player.id == PlayerStats.player_id
+    ).join(
+        Game, Game.id == PlayerStats.game_id
+    ).where(
+        Game.season == season,
+        Game.is_deleted == False,
+        PlayerStats.is_deleted == False,
+        phase_filter(phase)
+    )
+    if league is not None:
+        query = query.where(Game.league == league)
+    return query, PlayerStats, func.count(distinct(PlayerStats.game_id))
+
+def _season_totals_source(season: int, phase: str):
+    """Aggregate the maintained per-phase season totals: one or two rows per player"""
+    query = select().select_from(PlayerSeasonTotals).join(
+        Player, Player.id == PlayerSeasonTotals.player_id
+    ).where(PlayerSeasonTotals.season == season)
+    if phase != "all":
+        query = query.where(PlayerSeasonTotals.phase == phase)
+    return query, PlayerSeasonTotals, func.sum(PlayerSeasonTotals.games_played)
+
+def leaderboard_query(season: int, phase: str, category: str, sort: Optional[str] = None, limit: Optional[int] = None, league: Optional[str] = None):
+    """Per-player season totals for one category, aggregated and ranked in SQL"""
+    if league is None:
+        query, source, games_played = _season_totals_source(season, phase)
+    else:
+        query, source, games_played = _stat_lines_source(season, phase, league)
+
+    spec = CATEGORIES[category]
+    sums = {column: func.coalesce(func.sum(getattr(source, column)), 0) for column in spec["columns"]}
+    derived = {name: build(sums) for name, build in DERIVED.get(category, {}).items()}
+    values = {**sums, **derived}
+
+    sort_keys = [sort] if sort else spec["sort"]
+    unknown = [key for key in sort_keys if key not in values]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort {category} by '{unknown[0]}'. Choose one of: {', '.join(values)}"
+        )
+
+    query = query.add_columns(
+        Player.name.label("player_name"),
+        games_played.label("games_played"),
+        *[value.label(name) for name, value in values.items()]
+    ).group_by(Player.name)
+
+    # Only list players who recorded something in this category
+    if "require" in spec:
+        query = query.having(sums[spec["require"]] > 0)
+    else:
+        query = query.having(sum(sums.values()) > 0)
+
+    query = query.order_by(*[values[key].desc() for key in sort_keys], Player.name)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+@router.get("/leaders", response_model=LeaderboardResponse)
+def get_leaders(
+    season: int,
+    phase: str = Query("regular", pattern="^(regular|playoff|all)$"),
+    category: str = Query("passing", pattern="^(passing|rushing|receiving|defense)$"),
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    league: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Season leaderboard for one stat category, computed with GROUP BY in the
+    database. Playoff weeks are excluded from `regular` and are the only weeks in
+    `playoff`. Sort defaults to the category's headline stat. Results are cached
+    until the next write to the season.
+    """
+    def compute():
+        rows = db.execute(leaderboard_query(season, phase, category, sort, limit, league)).all()
+        return LeaderboardResponse(
+            success=True,
+            season=season,
+            phase=phase,
+            category=category,
+            sort=sort or ",".join(CATEGORIES[category]["sort"]),
+            data=[
+                LeaderboardEntry(
+                    rank=rank,
+                    player_name=row.player_name,
+                    games_played=row.games_played,
+                    stats={key: value for key, value in row._mapping.items() if key not in ("player_name", "games_played")}
+                )
+                for rank, row in enumerate(rows, start=1)
+            ]
+        )
+
+    key = ("leaders", season, league, phase, category, sort, limit)
+    return get_aggregate_cache().get_or_compute(key, season, compute)
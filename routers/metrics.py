@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from monitoring.metrics import render_metrics
+
+router = APIRouter(tags=["health"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text-format metrics for routes, SQL statements and the connection pool.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,58 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+# Keyset pagination for list endpoints. A cursor is the sort key of the last row
+# of a page, encoded opaquely; the next page is the rows after that key, so deep
+# pages use the same index range scan as the first one and concurrent inserts do
+# not shift rows between pages. Offset paging (skip) still works when no cursor
+# is given.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Only scalar sort keys are ever encoded (bool is an int subclass, so exclude it by type)
+    if any(type(value) not in (int, float, str) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def after_key(columns, values):
+    """Rows sorting after `values` on `columns`, spelled out for backends without row-value comparison"""
+    clauses = []
+    for index, column in enumerate(columns):
+        equal = [columns[i] == values[i] for i in range(index)]
+        clauses.append(and_(*equal, column > values[index]))
+    if len(columns) == 1:
+        return clauses[0]
+    # The redundant bound on the leading column lets the planner seek the index
+    return and_(columns[0] >= values[0], or_(*clauses))
+
+def paginate(query, columns, skip: int, limit: int, cursor: Optional[str]):
+    """Order by `columns`, then page by cursor if given, otherwise by offset"""
+    query = query.order_by(*columns)
+    if cursor:
+        query = query.where(after_key(columns, decode_cursor(cursor, len(columns))))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def set_next_cursor(response: Response, keys, limit: int):
+    """
+    Advertise the cursor for the page after this one in the X-Next-Cursor header.
+    `keys` are the sort keys of the page's rows; a short page is the last one.
+    """
+    if keys and len(keys) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(keys[-1])
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select
+from sqlalchemy.exc import OperationalError
 
 from database.database import get_db
+from database.sqlite_profile import retry_on_locked
+from database.aggregate_cache import invalidate_seasons, forget_final_boxscores
+from routers.conditional import collection_etag, fingerprint, not_modified
+from routers.pagination import paginate, set_next_cursor
+from routers.fast_json import json_response, rows_to_dicts
+from database.people import person_for_name
+from models.person import Person
 from models.player import Player
+from models.player_season_totals import PlayerSeasonTotals, TOTAL_FIELDS
 from models.team import Team
-from schemas.players import PlayerCreate, PlayerOut, PlayerUpdate, PlayerResponse
+from schemas.players import PlayerCreate, PlayerOut, PlayerUpdate, PlayerResponse, CareerSeason, PlayerCareer, PlayerCareerResponse
 from schemas.teams import TeamOut
 
 router = APIRouter(
@@ -16,6 +25,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=PlayerResponse)
+@retry_on_locked
 def create_player(player: PlayerCreate, db: Session = Depends(get_db)):
     try:
         # First find the team by name
@@ -23,6 +33,14 @@ def create_player(player: PlayerCreate, db: Session = Depends(get_db)):
         if not team:
             raise HTTPException(status_code=404, detail=f"Team '{player.team_name}' not found")
         
+        # Link the entry to the same person as the player's other seasons
+        if player.person_id is not None:
+            if not db.get(Person, player.person_id):
+                raise HTTPException(status_code=404, detail=f"Person with id '{player.person_id}' not found")
+            person_id = player.person_id
+        else:
+            person_id = person_for_name(db, player.name)
+        
         # Create new player
         now = datetime.utcnow()
         db_player = Player(
@@ -31,6 +49,7 @@ def create_player(player: PlayerCreate, db: Session = Depends(get_db)):
             season=player.season,
             is_active=player.is_active,
             jersey_number=player.jersey_number,
+            person_id=person_id,
             version=1,
             is_deleted=False,
             created_at=now,
@@ -49,6 +68,7 @@ def create_player(player: PlayerCreate, db: Session = Depends(get_db)):
                 display_name=display_name,
                 is_active=db_player.is_active,
                 jersey_number=db_player.jersey_number,
+                person_id=db_player.person_id,
                 version=db_player.version,
                 created_at=db_player.created_at,
                 updated_at=db_player.updated_at,
@@ -73,40 +93,61 @@ def create_player(player: PlayerCreate, db: Session = Depends(get_db)):
                 data=player_data,
                 message="Player created successfully"
             )
+        except OperationalError:
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to create player: {str(e)}")
         
-    except HTTPException:
+    except (HTTPException, OperationalError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
-@router.get("/", response_model=List[PlayerOut])
-def get_players(skip: int = 0, limit: int = 100, include_deleted: bool = False, db: Session = Depends(get_db)):
-    query = db.query(Player)
+def page_players(query, skip: int, limit: int, include_deleted: bool, cursor: Optional[str] = None):
+    query = query.select_from(Player).outerjoin(Team, Team.id == Player.team_id)
     if not include_deleted:
-        query = query.filter(Player.is_deleted == False)
-    players = query.offset(skip).limit(limit).all()
-    
-    # Create response with all required fields
-    return [
-        PlayerOut(
-            id=player.id,
-            name=player.name,
-            team_id=player.team_id,
-            team_name=player.team.name if player.team else None,
-            season=player.season,
-            display_name=f"#{player.jersey_number} {player.name}" if player.jersey_number else player.name,
-            is_active=player.is_active,
-            jersey_number=player.jersey_number,
-            version=player.version,
-            created_at=player.created_at,
-            updated_at=player.updated_at,
-            is_deleted=player.is_deleted,
-            deleted_at=player.deleted_at
-        ) for player in players
-    ]
+        query = query.where(Player.is_deleted == False)
+    return paginate(query, [Player.id], skip, limit, cursor)
+
+def players_etag_query(skip: int, limit: int, include_deleted: bool, cursor: Optional[str] = None):
+    """ETag fingerprint of a players page, including the teams whose names it shows"""
+    return page_players(select(*fingerprint(Player, Team)), skip, limit, include_deleted, cursor)
+
+def players_list_query(skip: int, limit: int, include_deleted: bool, cursor: Optional[str] = None):
+    """Every stored PlayerOut field plus the team name, in one joined select"""
+    columns = [Player.__table__.c[field] for field in PlayerOut.model_fields if field not in ('display_name', 'team_name')]
+    return page_players(select(*columns, Team.name.label("team_name")), skip, limit, include_deleted, cursor)
+
+def player_list_item(player):
+    """Complete a players_list_query() row dict with the derived PlayerOut fields"""
+    player["display_name"] = f"#{player['jersey_number']} {player['name']}" if player['jersey_number'] else player['name']
+    return player
+
+@router.get("/", response_model=List[PlayerOut])
+def get_players(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Players ordered by id. Pass the X-Next-Cursor response header back as
+    `cursor` to fetch the next page; `skip` is ignored when a cursor is given.
+    """
+    etag = collection_etag(db, players_etag_query(skip, limit, include_deleted, cursor))
+    cached = not_modified(request, response, etag)
+    if cached:
+        # A revalidated page still needs its next cursor for the client to advance
+        keys = db.execute(page_players(select(Player.id), skip, limit, include_deleted, cursor)).all()
+        set_next_cursor(cached, keys, limit)
+        return cached
+    players = rows_to_dicts(db.execute(players_list_query(skip, limit, include_deleted, cursor)))
+    set_next_cursor(response, [(player['id'],) for player in players], limit)
+    return json_response([player_list_item(player) for player in players], response)
 
 @router.get("/{player_id}", response_model=PlayerResponse)
 def get_player(player_id: int, include_deleted: bool = False, db: Session = Depends(get_db)):
@@ -128,6 +169,7 @@ def get_player(player_id: int, include_deleted: bool = False, db: Session = Depe
         display_name=f"#{player.jersey_number} {player.name}" if player.jersey_number else player.name,
         is_active=player.is_active,
         jersey_number=player.jersey_number,
+        person_id=player.person_id,
         version=player.version,
         created_at=player.created_at,
         updated_at=player.updated_at,
@@ -141,7 +183,55 @@ def get_player(player_id: int, include_deleted: bool = False, db: Session = Depe
         message="Player retrieved successfully"
     )
 
+def career_query(person_id: int, phase: str):
+    """Season totals of every roster entry of one person, summed per season"""
+    query = select(
+        PlayerSeasonTotals.season,
+        func.sum(PlayerSeasonTotals.games_played).label("games_played"),
+        *[func.sum(getattr(PlayerSeasonTotals, field)).label(field) for field in TOTAL_FIELDS]
+    ).join(
+        Player, Player.id == PlayerSeasonTotals.player_id
+    ).where(Player.person_id == person_id)
+    if phase != "all":
+        query = query.where(PlayerSeasonTotals.phase == phase)
+    return query.group_by(PlayerSeasonTotals.season).order_by(PlayerSeasonTotals.season)
+
+@router.get("/{player_id}/career", response_model=PlayerCareerResponse)
+def get_player_career(
+    player_id: int,
+    phase: str = Query("all", pattern="^(regular|playoff|all)$"),
+    db: Session = Depends(get_db)
+):
+    """Per-season and career totals across every season of the player's person"""
+    player = db.query(Player).filter(Player.id == player_id, Player.is_deleted == False).first()
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    if player.person_id is None:
+        raise HTTPException(status_code=404, detail=f"Player '{player.name}' is not linked to a person")
+
+    seasons = [
+        CareerSeason(
+            season=row.season,
+            games_played=row.games_played,
+            stats={field: row[field] for field in TOTAL_FIELDS}
+        ) for row in db.execute(career_query(player.person_id, phase)).mappings()
+    ]
+    career = PlayerCareer(
+        person_id=player.person_id,
+        name=player.name,
+        phase=phase,
+        seasons=seasons,
+        games_played=sum(season.games_played for season in seasons),
+        totals={field: sum(season.stats[field] for season in seasons) for field in TOTAL_FIELDS}
+    )
+    return PlayerCareerResponse(
+        success=True,
+        data=career,
+        message="Player career retrieved successfully"
+    )
+
 @router.put("/{player_id}", response_model=PlayerResponse)
+@retry_on_locked
 def update_player(player_id: int, player_update: PlayerUpdate, version: int, db: Session = Depends(get_db)):
     db_player = db.query(Player).filter(
         and_(
@@ -168,12 +258,18 @@ def update_player(player_id: int, player_update: PlayerUpdate, version: int, db:
             raise HTTPException(status_code=404, detail=f"Team '{update_data['team_name']}' not found")
         update_data['team_id'] = team.id
         del update_data['team_name']
+    if update_data.get('person_id') is not None and not db.get(Person, update_data['person_id']):
+        raise HTTPException(status_code=404, detail=f"Person with id '{update_data['person_id']}' not found")
     
     # Update fields
+    seasons = {db_player.season, update_data.get('season', db_player.season)}
     for key, value in update_data.items():
         setattr(db_player, key, value)
     
     db.commit()
+    # Leaderboards are keyed by player name, and box scores show names and teams
+    invalidate_seasons(*seasons)
+    forget_final_boxscores()
     db.refresh(db_player)
     
     # Create response with all required fields
@@ -186,6 +282,7 @@ def update_player(player_id: int, player_update: PlayerUpdate, version: int, db:
         display_name=f"#{db_player.jersey_number} {db_player.name}" if db_player.jersey_number else db_player.name,
         is_active=db_player.is_active,
         jersey_number=db_player.jersey_number,
+        person_id=db_player.person_id,
         version=db_player.version,
         created_at=db_player.created_at,
         updated_at=db_player.updated_at,
@@ -200,6 +297,7 @@ def update_player(player_id: int, player_update: PlayerUpdate, version: int, db:
     )
 
 @router.delete("/{player_id}", response_model=PlayerResponse)
+@retry_on_locked
 def delete_player(player_id: int, version: int, db: Session = Depends(get_db)):
     db_player = db.query(Player).filter(
         and_(
@@ -219,8 +317,11 @@ def delete_player(player_id: int, version: int, db: Session = Depends(get_db)):
     db_player.is_deleted = True
     db_player.deleted_at = datetime.utcnow()
     db_player.version += 1
+    season = db_player.season
     
     db.commit()
+    invalidate_seasons(season)
+    forget_final_boxscores()
     db.refresh(db_player)
     
     return PlayerResponse(
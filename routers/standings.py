@@ -0,0 +1,189 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import OperationalError
+from sqlalchemy import case, func, select
+from typing import Optional
+
+from database.database import get_db
+from database.sqlite_profile import retry_on_locked
+from database.aggregate_cache import get_aggregate_cache, invalidate_seasons, invalidate_all_seasons
+from database.team_records import reconcile_team_records, rebuild_matchups
+from models.team import Team
+from models.team_matchup import TeamMatchup
+from schemas.teams import StandingsEntry, StandingsGroup, StandingsResponse
+
+router = APIRouter(
+    prefix="/standings",
+    tags=["standings"]
+)
+
+# Applied in order to teams level on win %, wins and losses
+TIEBREAKERS = ("head-to-head", "point differential", "points scored")
+
+def standings_query(season: Optional[int] = None, league: Optional[str] = None, active_only: bool = True):
+    """
+    Teams with games played, win percentage (ties count half) and rank within
+    their (league, season), ranked by win %, then wins, then fewest losses.
+    Teams equal on all three share a rank here; build_standings breaks those
+    ties.
+    """
+    wins, losses, ties = (func.coalesce(column, 0) for column in (Team.wins, Team.losses, Team.ties))
+    games_played = wins + losses + ties
+    win_pct = case((games_played > 0, (wins + 0.5 * ties) / games_played), else_=0.0)
+    group = (Team.league, Team.season)
+
+    query = select(
+        Team.id.label("team_id"),
+        Team.name.label("team_name"),
+        Team.league,
+        Team.season,
+        wins.label("wins"),
+        losses.label("losses"),
+        ties.label("ties"),
+        games_played.label("games_played"),
+        win_pct.label("win_pct"),
+        func.rank().over(partition_by=group, order_by=(win_pct.desc(), wins.desc(), losses)).label("rank"),
+    ).where(Team.is_deleted == False)
+    if active_only:
+        query = query.where(Team.is_active == 1)
+    if season is not None:
+        query = query.where(Team.season == season)
+    if league is not None:
+        query = query.where(Team.league == league)
+    return query.order_by(Team.season.desc(), Team.league, "rank", Team.name)
+
+def load_matchups(db: Session, team_ids):
+    """Head-to-head rows among the given teams as {(team_id, opponent_id): row}"""
+    if not team_ids:
+        return {}
+    rows = db.execute(select(TeamMatchup).where(TeamMatchup.team_id.in_(team_ids))).scalars()
+    return {(row.team_id, row.opponent_id): row for row in rows}
+
+def tiebreak_keys(block, matchups, points):
+    """
+    Sort key per team of a block level on record: head-to-head win % among the
+    block (only when every pair has played), then point differential, then points
+    scored. Every lookup is against the precomputed matchup rows.
+    """
+    played = len(block) > 1 and all(
+        (team, other) in matchups and matchups[(team, other)].games > 0
+        for team in block for other in block if team != other
+    )
+    keys = {}
+    for team in block:
+        head_to_head = 0.0
+        if played:
+            rows = [matchups[(team, other)] for other in block if other != team]
+            games = sum(row.games for row in rows)
+            head_to_head = sum(row.wins + 0.5 * row.ties for row in rows) / games
+        points_for, points_against = points.get(team, (0, 0))
+        keys[team] = (head_to_head, points_for - points_against, points_for)
+    return keys
+
+def _decided_by(key, neighbours):
+    """Name of the tiebreaker that separates a team from its closest neighbour, None if still tied"""
+    levels = []
+    for other in neighbours:
+        differing = [level for level, (a, b) in enumerate(zip(key, other)) if a != b]
+        if not differing:
+            return None
+        levels.append(differing[0])
+    return TIEBREAKERS[max(levels)] if levels else None
+
+def build_standings(rows, matchups):
+    """
+    Group ranked rows (already ordered by season, league, rank) per (league,
+    season), breaking ties on record with TIEBREAKERS. Teams still level after
+    every tiebreaker share a rank.
+    """
+    points = {}
+    for (team_id, _), row in matchups.items():
+        points_for, points_against = points.get(team_id, (0, 0))
+        points[team_id] = (points_for + row.points_for, points_against + row.points_against)
+
+    blocks = {}
+    for row in rows:
+        blocks.setdefault((row.league, row.season, row.rank), []).append(row)
+
+    groups = {}
+    for (league, season, rank), block in blocks.items():
+        group = groups.get((league, season))
+        if group is None:
+            group = groups[(league, season)] = StandingsGroup(league=league, season=season)
+        keys = tiebreak_keys([row.team_id for row in block], matchups, points)
+        block.sort(key=lambda row: keys[row.team_id], reverse=True)
+        ordered = [keys[row.team_id] for row in block]
+        for position, row in enumerate(block):
+            key = keys[row.team_id]
+            team_rank = rank + ordered.index(key)
+            tied = ordered.count(key) > 1
+            neighbours = [ordered[i] for i in (position - 1, position + 1) if 0 <= i < len(ordered)]
+            points_for, points_against = points.get(row.team_id, (0, 0))
+            group.teams.append(StandingsEntry(
+                rank=team_rank,
+                rank_display=f"T-{team_rank}" if tied else str(team_rank),
+                tied=tied,
+                team_id=row.team_id,
+                team_name=row.team_name,
+                wins=row.wins,
+                losses=row.losses,
+                ties=row.ties,
+                games_played=row.games_played,
+                win_pct=round(row.win_pct, 3),
+                points_for=points_for,
+                points_against=points_against,
+                point_differential=points_for - points_against,
+                tiebreaker=_decided_by(key, neighbours) if len(block) > 1 else None
+            ))
+    return list(groups.values())
+
+@router.get("/", response_model=StandingsResponse)
+def get_standings(
+    season: Optional[int] = None,
+    league: Optional[str] = None,
+    active_only: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked standings per (league, season), computed with window functions in the
+    database. Results are cached until the next write to the season (to any
+    season when `season` is omitted).
+    """
+    def compute():
+        rows = db.execute(standings_query(season, league, active_only)).all()
+        matchups = load_matchups(db, [row.team_id for row in rows])
+        return StandingsResponse(
+            success=True,
+            data=build_standings(rows, matchups)
+        )
+
+    key = ("standings", season, league, active_only)
+    return get_aggregate_cache().get_or_compute(key, season, compute)
+
+@router.post("/reconcile")
+@retry_on_locked
+def reconcile_standings(season: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Recompute team records from completed games (all seasons if omitted) in one
+    UPDATE, and rebuild the head-to-head rows used for tiebreakers
+    """
+    try:
+        corrected = reconcile_team_records(db, season)
+        matchups = rebuild_matchups(db, season)
+        db.commit()
+    except OperationalError:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to reconcile team records: {str(e)}")
+    if season is None:
+        invalidate_all_seasons()
+    else:
+        invalidate_seasons(season)
+    return {
+        "success": True,
+        "message": f"Corrected {corrected} team records and rebuilt {matchups} matchups",
+        "corrected": corrected,
+        "matchups": matchups
+    }
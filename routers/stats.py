@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, aliased
+from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import and_
+import csv
+import io
+import json
+from sqlalchemy import and_, or_, case, func, select
+from sqlalchemy.exc import OperationalError
 
-from database.database import get_db
+from database.database import get_db, get_sessionmaker, upsert_insert
+from database.sqlite_profile import retry_on_locked
+from database.season_totals import apply_totals_delta, stat_delta, stat_values
+from database.aggregate_cache import invalidate_seasons
+from database.arrow_export import ARROW_STREAM_MEDIA_TYPE, arrow_available, arrow_ipc_stream, arrow_schema
+from routers.conditional import collection_etag, fingerprint, not_modified
+from routers.pagination import paginate, set_next_cursor
+from routers.fast_json import json_response, rows_to_dicts
 from models.player_stats import PlayerStats
 from models.player import Player
 from models.game import Game
@@ -16,11 +28,259 @@ router = APIRouter(
     tags=["stats"]
 )
 
+# Stat columns a client can submit for a player/game line
+STAT_FIELDS = [field for field in PlayerStatsCreateById.model_fields if field not in ('player_id', 'game_id')]
+
+def stats_out_query():
+    """
+    Select exactly the columns PlayerStatsOut needs in one statement: the stat
+    line plus player name, game week/season/league and both team names.
+    """
+    team1 = aliased(Team)
+    team2 = aliased(Team)
+    stats_table = PlayerStats.__table__
+    return select(
+        stats_table.c.id,
+        stats_table.c.player_id,
+        func.coalesce(Player.name, "").label("player_name"),
+        stats_table.c.game_id,
+        func.coalesce(Game.week, 0).label("game_week"),
+        func.coalesce(Game.season, 0).label("game_season"),
+        func.coalesce(Game.league, "").label("league"),
+        func.coalesce(team1.name, "").label("team1_name"),
+        func.coalesce(team2.name, "").label("team2_name"),
+        *[stats_table.c[field] for field in STAT_FIELDS],
+        stats_table.c.version,
+        stats_table.c.created_at,
+        stats_table.c.updated_at,
+        stats_table.c.is_deleted,
+        stats_table.c.deleted_at
+    ).select_from(stats_table).outerjoin(
+        Player, Player.id == stats_table.c.player_id
+    ).outerjoin(
+        Game, Game.id == stats_table.c.game_id
+    ).outerjoin(
+        team1, team1.id == Game.team1_id
+    ).outerjoin(
+        team2, team2.id == Game.team2_id
+    )
+
+def stats_fingerprint_query():
+    """ETag fingerprint of the rows stats_out_query() reads, over the same joins"""
+    team1 = aliased(Team)
+    team2 = aliased(Team)
+    return select(*fingerprint(PlayerStats, Player, Game, team1, team2)).select_from(PlayerStats).outerjoin(
+        Player, Player.id == PlayerStats.player_id
+    ).outerjoin(
+        Game, Game.id == PlayerStats.game_id
+    ).outerjoin(
+        team1, team1.id == Game.team1_id
+    ).outerjoin(
+        team2, team2.id == Game.team2_id
+    )
+
+def batch_stats_query(week: int = None, season: int = None, game_id: int = None, require_filter: bool = True):
+    """stats_out_query() filtered for GET /stats/batch/"""
+    # At least one filter must be provided, except for streamed exports
+    if require_filter and week is None and season is None and game_id is None:
+        raise HTTPException(status_code=400, detail="At least one of week, season, or game_id must be provided.")
+    return filter_batch(stats_out_query(), week, season, game_id)
+
+def batch_stats_etag_query(week: int = None, season: int = None, game_id: int = None):
+    return filter_batch(stats_fingerprint_query(), week, season, game_id)
+
+def filter_batch(query, week: int = None, season: int = None, game_id: int = None):
+    if game_id is not None:
+        query = query.where(PlayerStats.game_id == game_id)
+    if week is not None:
+        query = query.where(Game.week == week)
+    if season is not None:
+        query = query.where(Game.season == season)
+    return query.where(PlayerStats.is_deleted == False).order_by(PlayerStats.id)
+
+def build_stats_out(row):
+    """Build PlayerStatsOut from a stats_out_query() row"""
+    return PlayerStatsOut(**row._mapping)
+
+# Rows fetched from the cursor per chunk when streaming an export
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def export_header(keys, format: str):
+    """Text that starts an export before any rows (the CSV header line)"""
+    if format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(keys)
+        return buffer.getvalue()
+    return ""
+
+def export_chunk(rows, format: str):
+    """Encode a batch of stats_out_query() rows as NDJSON lines or CSV records"""
+    if format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(dict(row._mapping), default=_json_default) + "\n" for row in rows)
+
+def stream_stats_export(query, format: str):
+    """
+    Stream query results as NDJSON, CSV or an Arrow IPC stream, reading the cursor
+    in batches of EXPORT_BATCH_SIZE so memory stays flat however many rows match.
+    The stream uses its own session because it outlives the request handler.
+    """
+    if format == "arrow" and not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow to be installed")
+
+    def generate():
+        db = get_sessionmaker()()
+        try:
+            result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            if format == "arrow":
+                yield from arrow_ipc_stream(result, arrow_schema(query))
+                return
+            yield export_header(list(result.keys()), format)
+            for rows in result.partitions():
+                yield export_chunk(rows, format)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="player_stats.{format}"'}
+    )
+
+def resolve_season_players(db: Session, player_ids, season: int):
+    """
+    Map each requested player id to its roster entry for `season` in one query:
+    the same id if it is on that season's roster, otherwise an active entry of the
+    same person. Ids that cannot be resolved are left out of the result.
+    """
+    requested = aliased(Player)
+    rows = db.query(requested.id, Player).join(
+        Player,
+        and_(
+            Player.season == season,
+            or_(
+                Player.id == requested.id,
+                and_(
+                    Player.person_id == requested.person_id,
+                    Player.is_active == True,
+                    Player.is_deleted == False
+                )
+            )
+        )
+    ).filter(requested.id.in_(player_ids)).all()
+    resolved = {}
+    for requested_id, player in rows:
+        if requested_id not in resolved or player.id == requested_id:
+            resolved[requested_id] = player
+    return resolved
+
+def _upsert_statement(insert, set_fields):
+    """
+    INSERT ... ON CONFLICT (player_id, game_id) DO UPDATE ... RETURNING for stat lines.
+    On conflict, fields in set_fields are overwritten and the rest keep their stored
+    values, unless the stored line is soft-deleted, in which case it is replaced.
+    The version is bumped in the same statement.
+    """
+    table = PlayerStats.__table__
+    stmt = insert(table)
+    set_ = {}
+    for field in STAT_FIELDS:
+        if field in set_fields:
+            set_[field] = stmt.excluded[field]
+        else:
+            set_[field] = case((table.c.is_deleted == True, stmt.excluded[field]), else_=table.c[field])
+    set_.update(
+        version=table.c.version + 1,
+        is_deleted=False,
+        deleted_at=None,
+        updated_at=func.now()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['player_id', 'game_id'],
+        set_=set_
+    ).returning(*table.c)
+
+def live_stat_lines(db: Session, game_id: int, player_ids):
+    """Current live stat lines for players in a game, keyed by player id"""
+    rows = db.query(PlayerStats).filter(
+        PlayerStats.game_id == game_id,
+        PlayerStats.player_id.in_(list(player_ids)),
+        PlayerStats.is_deleted == False
+    ).all()
+    return {row.player_id: stat_values(row) for row in rows}
+
+def upsert_stats(db: Session, player_id: int, game_id: int, stats: PlayerStatsCreateById):
+    """
+    Insert or update the stat line for (player_id, game_id) and return the stored row.
+    Fields the client did not send keep their stored values; a soft-deleted line is
+    revived with the submitted values.
+    """
+    insert = upsert_insert(db)
+    if insert is None:
+        return _upsert_stats_orm(db, player_id, game_id, stats, stats.model_fields_set)
+    values = {field: getattr(stats, field) for field in STAT_FIELDS}
+    stmt = _upsert_statement(insert, stats.model_fields_set).values(player_id=player_id, game_id=game_id, **values)
+    return db.execute(stmt).one()
+
+def upsert_stats_many(db: Session, game_id: int, lines):
+    """
+    Write complete stat lines for one game in a single multi-row
+    INSERT ... ON CONFLICT DO UPDATE.
+    `lines` is a list of (player_id, stats) pairs with distinct player ids.
+    Returns the stored rows.
+    """
+    insert = upsert_insert(db)
+    if insert is None:
+        return [_upsert_stats_orm(db, player_id, game_id, stats, STAT_FIELDS) for player_id, stats in lines]
+    params = [
+        dict(player_id=player_id, game_id=game_id, **{field: getattr(stats, field) for field in STAT_FIELDS})
+        for player_id, stats in lines
+    ]
+    return db.execute(_upsert_statement(insert, STAT_FIELDS).values(params)).all()
+
+def _upsert_stats_orm(db: Session, player_id: int, game_id: int, stats, set_fields):
+    """Fallback for dialects without ON CONFLICT ... RETURNING: lock, then update or insert"""
+    db_stats = db.query(PlayerStats).filter(
+        PlayerStats.player_id == player_id,
+        PlayerStats.game_id == game_id
+    ).with_for_update().first()
+    if db_stats is None:
+        db_stats = PlayerStats(player_id=player_id, game_id=game_id)
+        db.add(db_stats)
+        fields = STAT_FIELDS
+    else:
+        fields = STAT_FIELDS if db_stats.is_deleted else [f for f in STAT_FIELDS if f in set_fields]
+        db_stats.version += 1
+        db_stats.is_deleted = False
+        db_stats.deleted_at = None
+    for field in fields:
+        setattr(db_stats, field, getattr(stats, field))
+    db.flush()
+    db.refresh(db_stats)
+    return db_stats
+
 @router.post("/", response_model=PlayerStatsResponse)
+@retry_on_locked
 def create_stats_by_id(stats: PlayerStatsCreateById, db: Session = Depends(get_db)):
     try:
         # Find the game first to get the season
-        game = db.query(Game).filter(Game.id == stats.game_id).first()
+        game = db.query(Game).options(
+            joinedload(Game.team1),
+            joinedload(Game.team2)
+        ).filter(Game.id == stats.game_id).first()
         if not game:
             raise HTTPException(status_code=404, detail=f"Game with id '{stats.game_id}' not found")
             
@@ -28,174 +288,117 @@ def create_stats_by_id(stats: PlayerStatsCreateById, db: Session = Depends(get_d
         if game.completed:
             raise HTTPException(status_code=403, detail="Cannot edit stats for a completed game.")
             
-        # Find the player matching both ID and season
+        # Find the player matching both ID and season, otherwise the same person's
+        # active roster entry in the game's season
+        requested_person = select(Player.person_id).where(Player.id == stats.player_id).scalar_subquery()
         player = db.query(Player).filter(
-            and_(
+            Player.season == game.season,
+            or_(
                 Player.id == stats.player_id,
-                Player.season == game.season
+                and_(
+                    Player.person_id == requested_person,
+                    Player.is_active == True,
+                    Player.is_deleted == False
+                )
             )
-        ).first()
+        ).order_by(case((Player.id == stats.player_id, 0), else_=1)).first()
         
-        # If not found, try to find any active player with the same name in the current season
         if not player:
-            # First get the original player to get their name
             original_player = db.query(Player).filter(Player.id == stats.player_id).first()
             if not original_player:
                 raise HTTPException(status_code=404, detail=f"Player with id '{stats.player_id}' not found")
-                
-            # Try to find the current season's version of this player
-            current_player = db.query(Player).filter(
-                and_(
-                    Player.name == original_player.name,
-                    Player.season == game.season,
-                    Player.is_active == True,
-                    Player.is_deleted == False
-                )
-            ).first()
-            
-            if current_player:
-                player = current_player
-            else:
-                raise HTTPException(
-                    status_code=404, 
-                    detail=f"No active player record found for '{original_player.name}' in season {game.season}"
-                )
-        
-        # Check if PlayerStats already exists for this player and game
-        db_stats = db.query(PlayerStats).filter(
-            PlayerStats.player_id == player.id,
-            PlayerStats.game_id == game.id,
-            PlayerStats.is_deleted == False
-        ).first()
+            raise HTTPException(
+                status_code=404, 
+                detail=f"No active player record found for '{original_player.name}' in season {game.season}"
+            )
         
-        if db_stats:
-            # Only update fields present in the request
-            update_data = stats.dict(exclude_unset=True)
-            for key, value in update_data.items():
-                if key not in ['player_id', 'game_id']:
-                    setattr(db_stats, key, value)
-            db_stats.version += 1
-            db.commit()
-            db.refresh(db_stats)
-        else:
-            # Create new stats row
-            db_stats = PlayerStats(
+        try:
+            previous = live_stat_lines(db, game.id, [player.id]).get(player.id)
+            db_stats = upsert_stats(db, player.id, game.id, stats)
+            apply_totals_delta(db, game, [stat_delta(player.id, previous, db_stats)])
+            # Build the response before committing, which expires the loaded player and game
+            stats_data = PlayerStatsOut(
+                id=db_stats.id,
                 player_id=player.id,
+                player_name=player.name,
                 game_id=game.id,
-                passing_tds=stats.passing_tds,
-                passes_completed=stats.passes_completed,
-                passes_attempted=stats.passes_attempted,
-                interceptions_thrown=stats.interceptions_thrown,
-                receptions=stats.receptions,
-                targets=stats.targets,
-                receiving_tds=stats.receiving_tds,
-                drops=stats.drops,
-                first_downs=stats.first_downs,
-                rushing_tds=stats.rushing_tds,
-                rush_attempts=stats.rush_attempts,
-                flag_pulls=stats.flag_pulls,
-                interceptions=stats.interceptions,
-                pass_breakups=stats.pass_breakups,
-                def_td=stats.def_td,
-                sacks=stats.sacks
+                game_week=game.week,
+                game_season=game.season,
+                league=game.league,
+                team1_name=game.team1.name,
+                team2_name=game.team2.name,
+                passing_tds=db_stats.passing_tds,
+                passes_completed=db_stats.passes_completed,
+                passes_attempted=db_stats.passes_attempted,
+                interceptions_thrown=db_stats.interceptions_thrown,
+                qb_rushing_tds=db_stats.qb_rushing_tds,
+                receptions=db_stats.receptions,
+                targets=db_stats.targets,
+                receiving_tds=db_stats.receiving_tds,
+                drops=db_stats.drops,
+                first_downs=db_stats.first_downs,
+                rushing_tds=db_stats.rushing_tds,
+                rush_attempts=db_stats.rush_attempts,
+                flag_pulls=db_stats.flag_pulls,
+                interceptions=db_stats.interceptions,
+                pass_breakups=db_stats.pass_breakups,
+                def_td=db_stats.def_td,
+                sacks=db_stats.sacks,
+                version=db_stats.version,
+                created_at=db_stats.created_at,
+                updated_at=db_stats.updated_at,
+                is_deleted=db_stats.is_deleted,
+                deleted_at=db_stats.deleted_at
             )
-            try:
-                db.add(db_stats)
-                db.commit()
-                db.refresh(db_stats)
-            except Exception as e:
-                db.rollback()
-                raise HTTPException(status_code=500, detail=f"Failed to create stats: {str(e)}")
-                
-        # Create response
-        stats_data = PlayerStatsOut(
-            id=db_stats.id,
-            player_id=player.id,
-            player_name=player.name,
-            game_id=game.id,
-            game_week=game.week,
-            game_season=game.season,
-            league=game.league,
-            team1_name=game.team1.name,
-            team2_name=game.team2.name,
-            passing_tds=db_stats.passing_tds,
-            passes_completed=db_stats.passes_completed,
-            passes_attempted=db_stats.passes_attempted,
-            interceptions_thrown=db_stats.interceptions_thrown,
-            qb_rushing_tds=db_stats.qb_rushing_tds,
-            receptions=db_stats.receptions,
-            targets=db_stats.targets,
-            receiving_tds=db_stats.receiving_tds,
-            drops=db_stats.drops,
-            first_downs=db_stats.first_downs,
-            rushing_tds=db_stats.rushing_tds,
-            rush_attempts=db_stats.rush_attempts,
-            flag_pulls=db_stats.flag_pulls,
-            interceptions=db_stats.interceptions,
-            pass_breakups=db_stats.pass_breakups,
-            def_td=db_stats.def_td,
-            sacks=db_stats.sacks,
-            version=db_stats.version,
-            created_at=db_stats.created_at,
-            updated_at=db_stats.updated_at,
-            is_deleted=db_stats.is_deleted,
-            deleted_at=db_stats.deleted_at
-        )
+            db.commit()
+            invalidate_seasons(stats_data.game_season)
+        except OperationalError:
+            raise
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to save stats: {str(e)}")
         
         return PlayerStatsResponse(
             success=True,
             data=stats_data,
-            message="Stats updated successfully" if db_stats else "Stats created successfully"
+            message="Stats created successfully" if stats_data.version == 1 else "Stats updated successfully"
         )
-    except HTTPException:
+    except (HTTPException, OperationalError):
         db.rollback()
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
-@router.get("/", response_model=List[PlayerStatsOut])
-def get_stats(skip: int = 0, limit: int = 100, include_deleted: bool = False, db: Session = Depends(get_db)):
-    query = db.query(PlayerStats)
+def page_stats(query, skip: int, limit: int, include_deleted: bool, cursor: Optional[str] = None):
     if not include_deleted:
-        query = query.filter(PlayerStats.is_deleted == False)
-    stats = query.offset(skip).limit(limit).all()
-    # Manually construct PlayerStatsOut for each stat
-    return [
-        PlayerStatsOut(
-            id=stat.id,
-            player_id=stat.player_id,
-            player_name=stat.player.name if stat.player else "",
-            game_id=stat.game_id,
-            game_week=stat.game.week if stat.game else 0,
-            game_season=stat.game.season if stat.game else 0,
-            league=stat.game.league if stat.game else "",
-            team1_name=stat.game.team1.name if stat.game and stat.game.team1 else "",
-            team2_name=stat.game.team2.name if stat.game and stat.game.team2 else "",
-            passing_tds=stat.passing_tds,
-            passes_completed=stat.passes_completed,
-            passes_attempted=stat.passes_attempted,
-            interceptions_thrown=stat.interceptions_thrown,
-            receptions=stat.receptions,
-            targets=stat.targets,
-            receiving_tds=stat.receiving_tds,
-            drops=stat.drops,
-            first_downs=stat.first_downs,
-            rushing_tds=stat.rushing_tds,
-            rush_attempts=stat.rush_attempts,
-            flag_pulls=stat.flag_pulls,
-            interceptions=stat.interceptions,
-            pass_breakups=stat.pass_breakups,
-            def_td=stat.def_td,
-            sacks=stat.sacks,
-            version=stat.version,
-            created_at=stat.created_at,
-            updated_at=stat.updated_at,
-            is_deleted=stat.is_deleted,
-            deleted_at=stat.deleted_at
-        )
-        for stat in stats
-    ]
+        query = query.where(PlayerStats.is_deleted == False)
+    return paginate(query, [PlayerStats.id], skip, limit, cursor)
+
+@router.get("/", response_model=List[PlayerStatsOut])
+def get_stats(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Stat lines ordered by id. Pass the X-Next-Cursor response header back as
+    `cursor` to fetch the next page; `skip` is ignored when a cursor is given.
+    """
+    etag = collection_etag(db, page_stats(stats_fingerprint_query(), skip, limit, include_deleted, cursor))
+    cached = not_modified(request, response, etag)
+    if cached:
+        # A revalidated page still needs its next cursor for the client to advance
+        keys = db.execute(page_stats(select(PlayerStats.id), skip, limit, include_deleted, cursor)).all()
+        set_next_cursor(cached, keys, limit)
+        return cached
+    rows = db.execute(page_stats(stats_out_query(), skip, limit, include_deleted, cursor)).all()
+    set_next_cursor(response, [(row.id,) for row in rows], limit)
+    return [build_stats_out(row) for row in rows]
 
 @router.get("/{stats_id}", response_model=PlayerStatsResponse)
 def get_stat(stats_id: int, include_deleted: bool = False, db: Session = Depends(get_db)):
@@ -213,17 +416,27 @@ def get_stat(stats_id: int, include_deleted: bool = False, db: Session = Depends
     )
 
 @router.put("/{stats_id}", response_model=PlayerStatsResponse)
+@retry_on_locked
 def update_stats(stats_id: int, stats_update: PlayerStatsUpdate, version: int, db: Session = Depends(get_db)):
+    # Locked so the version check and the totals delta see the committed line
     db_stats = db.query(PlayerStats).filter(
         and_(
             PlayerStats.id == stats_id,
             PlayerStats.is_deleted == False
         )
-    ).first()
+    ).with_for_update().first()
     
     if not db_stats:
         raise HTTPException(status_code=404, detail="Stats not found")
     
+    # Totals are kept per game season, so a line without its game cannot be changed
+    if db_stats.game is None:
+        raise HTTPException(status_code=404, detail=f"Game with id '{db_stats.game_id}' not found")
+    
+    # Prevent stat edits if game is completed
+    if db_stats.game.completed:
+        raise HTTPException(status_code=403, detail="Cannot edit stats for a completed game.")
+    
     # Check version for optimistic locking
     if db_stats.version != version:
         raise HTTPException(status_code=409, detail="Record has been modified. Please refresh and try again.")
@@ -232,12 +445,16 @@ def update_stats(stats_id: int, stats_update: PlayerStatsUpdate, version: int, d
     db_stats.version += 1
     
     # Update fields
+    previous = stat_values(db_stats)
     update_data = stats_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         if key not in ['player_id', 'game_id']:
             setattr(db_stats, key, value)
+    apply_totals_delta(db, db_stats.game, [stat_delta(db_stats.player_id, previous, db_stats)])
+    season = db_stats.game.season
     
     db.commit()
+    invalidate_seasons(season)
     db.refresh(db_stats)
     
     return PlayerStatsResponse(
@@ -247,17 +464,27 @@ def update_stats(stats_id: int, stats_update: PlayerStatsUpdate, version: int, d
     )
 
 @router.delete("/{stats_id}", response_model=PlayerStatsResponse)
+@retry_on_locked
 def delete_stats(stats_id: int, version: int, db: Session = Depends(get_db)):
+    # Locked so the version check and the totals delta see the committed line
     db_stats = db.query(PlayerStats).filter(
         and_(
             PlayerStats.id == stats_id,
             PlayerStats.is_deleted == False
         )
-    ).first()
+    ).with_for_update().first()
     
     if not db_stats:
         raise HTTPException(status_code=404, detail="Stats not found")
     
+    # Totals are kept per game season, so a line without its game cannot be changed
+    if db_stats.game is None:
+        raise HTTPException(status_code=404, detail=f"Game with id '{db_stats.game_id}' not found")
+    
+    # Prevent stat edits if game is completed
+    if db_stats.game.completed:
+        raise HTTPException(status_code=403, detail="Cannot edit stats for a completed game.")
+    
     # Check version for optimistic locking
     if db_stats.version != version:
         raise HTTPException(status_code=409, detail="Record has been modified. Please refresh and try again.")
@@ -266,8 +493,11 @@ def delete_stats(stats_id: int, version: int, db: Session = Depends(get_db)):
     db_stats.is_deleted = True
     db_stats.deleted_at = datetime.utcnow()
     db_stats.version += 1
+    apply_totals_delta(db, db_stats.game, [stat_delta(db_stats.player_id, db_stats, None)])
+    season = db_stats.game.season
     
     db.commit()
+    invalidate_seasons(season)
     db.refresh(db_stats)
     
     return PlayerStatsResponse(
@@ -281,100 +511,36 @@ def get_stats_by_player_game(
     game_id: int,
     db: Session = Depends(get_db)
 ):
-    stats = db.query(PlayerStats).filter(
+    row = db.execute(stats_out_query().where(
         PlayerStats.player_id == player_id,
         PlayerStats.game_id == game_id,
         PlayerStats.is_deleted == False
-    ).first()
-    if not stats:
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Stats not found")
-    # Populate extra fields from relationships
-    return PlayerStatsOut(
-        id=stats.id,
-        player_id=stats.player_id,
-        player_name=stats.player.name if stats.player else "",
-        game_id=stats.game_id,
-        game_week=stats.game.week if stats.game else 0,
-        game_season=stats.game.season if stats.game else 0,
-        league=stats.game.league if stats.game else "",
-        team1_name=stats.game.team1.name if stats.game and stats.game.team1 else "",
-        team2_name=stats.game.team2.name if stats.game and stats.game.team2 else "",
-        passing_tds=stats.passing_tds,
-        passes_completed=stats.passes_completed,
-        passes_attempted=stats.passes_attempted,
-        interceptions_thrown=stats.interceptions_thrown,
-        receptions=stats.receptions,
-        targets=stats.targets,
-        receiving_tds=stats.receiving_tds,
-        drops=stats.drops,
-        first_downs=stats.first_downs,
-        rushing_tds=stats.rushing_tds,
-        rush_attempts=stats.rush_attempts,
-        flag_pulls=stats.flag_pulls,
-        interceptions=stats.interceptions,
-        pass_breakups=stats.pass_breakups,
-        def_td=stats.def_td,
-        sacks=stats.sacks,
-        version=stats.version,
-        created_at=stats.created_at,
-        updated_at=stats.updated_at,
-        is_deleted=stats.is_deleted,
-        deleted_at=stats.deleted_at
-    )
+    return build_stats_out(row)
 
 @router.get("/batch/", response_model=List[PlayerStatsOut])
 def get_stats_batch(
+    request: Request,
+    response: Response,
     week: int = None,
     season: int = None,
     game_id: int = None,
+    format: str = Query("json", pattern="^(json|ndjson|csv|arrow)$"),
     db: Session = Depends(get_db)
 ):
-    # At least one filter must be provided
-    if week is None and season is None and game_id is None:
-        raise HTTPException(status_code=400, detail="At least one of week, season, or game_id must be provided.")
-    query = db.query(PlayerStats)
-    if game_id is not None:
-        query = query.filter(PlayerStats.game_id == game_id)
-    if week is not None:
-        query = query.join(PlayerStats.game).filter(Game.week == week)
-    if season is not None:
-        query = query.join(PlayerStats.game).filter(Game.season == season)
-    query = query.filter(PlayerStats.is_deleted == False)
-    stats = query.all()
-    # Manually construct PlayerStatsOut for each stat
-    return [
-        PlayerStatsOut(
-            id=stat.id,
-            player_id=stat.player_id,
-            player_name=stat.player.name if stat.player else "",
-            game_id=stat.game_id,
-            game_week=stat.game.week if stat.game else 0,
-            game_season=stat.game.season if stat.game else 0,
-            league=stat.game.league if stat.game else "",
-            team1_name=stat.game.team1.name if stat.game and stat.game.team1 else "",
-            team2_name=stat.game.team2.name if stat.game and stat.game.team2 else "",
-            passing_tds=stat.passing_tds,
-            passes_completed=stat.passes_completed,
-            passes_attempted=stat.passes_attempted,
-            interceptions_thrown=stat.interceptions_thrown,
-            qb_rushing_tds=stat.qb_rushing_tds,
-            receptions=stat.receptions,
-            targets=stat.targets,
-            receiving_tds=stat.receiving_tds,
-            drops=stat.drops,
-            first_downs=stat.first_downs,
-            rushing_tds=stat.rushing_tds,
-            rush_attempts=stat.rush_attempts,
-            flag_pulls=stat.flag_pulls,
-            interceptions=stat.interceptions,
-            pass_breakups=stat.pass_breakups,
-            def_td=stat.def_td,
-            sacks=stat.sacks,
-            version=stat.version,
-            created_at=stat.created_at,
-            updated_at=stat.updated_at,
-            is_deleted=stat.is_deleted,
-            deleted_at=stat.deleted_at
-        )
-        for stat in stats
-    ] 
\ No newline at end of file
+    """
+    Stats matching the filters. `format=ndjson`, `format=csv` or `format=arrow`
+    (Arrow IPC stream) streams the rows instead of building one JSON list, and may
+    be used without filters to export every season. JSON responses carry an ETag and honour If-None-Match.
+    """
+    if format != "json":
+        return stream_stats_export(batch_stats_query(week, season, game_id, require_filter=False), format)
+    query = batch_stats_query(week, season, game_id)
+    etag = collection_etag(db, batch_stats_etag_query(week, season, game_id))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    # stats_out_query() labels match PlayerStatsOut, so rows are encoded as-is
+    return json_response(rows_to_dicts(db.execute(query)), response)
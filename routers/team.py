@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import and_
+from sqlalchemy import and_, select, update
+from sqlalchemy.exc import OperationalError
 
 from database.database import get_db
+from database.sqlite_profile import retry_on_locked
+from database.aggregate_cache import invalidate_seasons, forget_final_boxscores
+from routers.conditional import collection_etag, fingerprint, not_modified
+from routers.fast_json import json_response, rows_to_dicts
 from models.team import Team
+from models.player import Player
 from schemas.teams import TeamCreate, TeamOut, TeamUpdate, TeamResponse, PlayerOut
 
 router = APIRouter(
@@ -14,6 +20,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=TeamResponse)
+@retry_on_locked
 def create_team(team: TeamCreate, db: Session = Depends(get_db)):
     now = datetime.utcnow()
     db_team = Team(
@@ -30,6 +37,7 @@ def create_team(team: TeamCreate, db: Session = Depends(get_db)):
     )
     db.add(db_team)
     db.commit()
+    invalidate_seasons(team.season)
     db.refresh(db_team)
     
     return TeamResponse(
@@ -38,50 +46,34 @@ def create_team(team: TeamCreate, db: Session = Depends(get_db)):
         message="Team created successfully"
     )
 
-@router.get("/", response_model=List[TeamOut])
-def get_teams(skip: int = 0, limit: int = 100, include_deleted: bool = False, db: Session = Depends(get_db)):
-    query = db.query(Team)
+# Columns of the teams listing: every TeamOut field stored on the table
+TEAM_LIST_COLUMNS = [Team.__table__.c[field] for field in TeamOut.model_fields if field != 'display_name']
+
+def page_teams(query, skip: int, limit: int, include_deleted: bool):
     if not include_deleted:
-        query = query.filter(Team.is_deleted == False)
-    teams = query.options(
-        joinedload(Team.players)
-    ).offset(skip).limit(limit).all()
-    
-    # Create response with proper team information for players
-    return [
-        TeamOut(
-            id=team.id,
-            name=team.name,
-            season=team.season,
-            league=team.league,
-            wins=team.wins,
-            losses=team.losses,
-            ties=team.ties,
-            version=team.version,
-            is_deleted=team.is_deleted,
-            created_at=team.created_at,
-            updated_at=team.updated_at,
-            deleted_at=team.deleted_at,
-            display_name=f"{team.name} (Season {team.season})",
-            players=[
-                PlayerOut(
-                    id=player.id,
-                    name=player.name,
-                    team_id=team.id,
-                    team_name=team.name,
-                    season=player.season,
-                    display_name=f"#{player.jersey_number} {player.name}" if player.jersey_number else player.name,
-                    is_active=player.is_active,
-                    jersey_number=player.jersey_number,
-                    version=player.version,
-                    is_deleted=player.is_deleted,
-                    created_at=player.created_at,
-                    updated_at=player.updated_at,
-                    deleted_at=player.deleted_at
-                ) for player in team.players
-            ]
-        ) for team in teams
-    ]
+        query = query.where(Team.is_deleted == False)
+    return query.order_by(Team.id).offset(skip).limit(limit)
+
+def teams_etag_query(skip: int, limit: int, include_deleted: bool):
+    """ETag fingerprint of a teams page"""
+    return page_teams(select(*fingerprint(Team)), skip, limit, include_deleted)
+
+def teams_list_query(skip: int, limit: int, include_deleted: bool):
+    return page_teams(select(*TEAM_LIST_COLUMNS), skip, limit, include_deleted)
+
+def team_list_item(team):
+    """Complete a teams_list_query() row dict with the derived TeamOut fields"""
+    team["display_name"] = f"{team['name']} (Season {team['season']})"
+    return team
+
+@router.get("/", response_model=List[TeamOut])
+def get_teams(request: Request, response: Response, skip: int = 0, limit: int = 100, include_deleted: bool = False, db: Session = Depends(get_db)):
+    etag = collection_etag(db, teams_etag_query(skip, limit, include_deleted))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    teams = rows_to_dicts(db.execute(teams_list_query(skip, limit, include_deleted)))
+    return json_response([team_list_item(team) for team in teams], response)
 
 @router.get("/{team_id}", response_model=TeamResponse)
 def get_team(team_id: int, include_deleted: bool = False, db: Session = Depends(get_db)):
@@ -130,6 +122,7 @@ def get_team(team_id: int, include_deleted: bool = False, db: Session = Depends(
     )
 
 @router.put("/{team_id}", response_model=TeamResponse)
+@retry_on_locked
 def update_team(team_id: int, team_update: TeamUpdate, version: int, db: Session = Depends(get_db)):
     db_team = db.query(Team).filter(
         and_(
@@ -150,10 +143,14 @@ def update_team(team_id: int, team_update: TeamUpdate, version: int, db: Session
     
     # Update fields
     update_data = team_update.model_dump(exclude_unset=True)
+    seasons = {db_team.season, update_data.get('season', db_team.season)}
     for key, value in update_data.items():
         setattr(db_team, key, value)
     
     db.commit()
+    invalidate_seasons(*seasons)
+    # Box scores show team names
+    forget_final_boxscores()
     db.refresh(db_team)
     
     return TeamResponse(
@@ -163,6 +160,7 @@ def update_team(team_id: int, team_update: TeamUpdate, version: int, db: Session
     )
 
 @router.delete("/{team_id}", response_model=TeamResponse)
+@retry_on_locked
 def delete_team(team_id: int, version: int, db: Session = Depends(get_db)):
     db_team = db.query(Team).filter(
         and_(
@@ -182,8 +180,11 @@ def delete_team(team_id: int, version: int, db: Session = Depends(get_db)):
     db_team.is_deleted = True
     db_team.deleted_at = datetime.utcnow()
     db_team.version += 1
+    season = db_team.season
     
     db.commit()
+    invalidate_seasons(season)
+    forget_final_boxscores()
     db.refresh(db_team)
     
     return TeamResponse(
@@ -192,37 +193,47 @@ def delete_team(team_id: int, version: int, db: Session = Depends(get_db)):
     )
 
 @router.post("/teams/end-season/{season}")
+@retry_on_locked
 def end_season(
     season: int,
     db: Session = Depends(get_db)
 ):
     """
-    Mark all teams from the specified season as inactive.
-    This should be called when transitioning to a new season.
+    Mark all teams and players from the specified season as inactive, with one
+    UPDATE per table in a single transaction. Versions of the changed rows are
+    bumped. This should be called when transitioning to a new season.
     """
     try:
-        # Get all active teams from the specified season
-        teams = db.query(Team).filter(
-            and_(
-                Team.season == season,
-                Team.is_active == 1
-            )
-        ).all()
-        
-        # Mark each team as inactive
-        for team in teams:
-            team.is_active = 0
+        teams_updated = db.execute(
+            update(Team)
+            .where(Team.season == season, Team.is_active == 1, Team.is_deleted == False)
+            .values(is_active=0, version=Team.version + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        players_updated = db.execute(
+            update(Player)
+            .where(Player.season == season, Player.is_active == True, Player.is_deleted == False)
+            .values(is_active=False, version=Player.version + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
         
         db.commit()
+        invalidate_seasons(season)
         return {
-            "message": f"Successfully marked all teams from season {season} as inactive",
-            "teams_updated": len(teams)
+            "success": True,
+            "message": f"Successfully marked all teams and players from season {season} as inactive",
+            "teams_updated": teams_updated,
+            "players_updated": players_updated
         }
+    except OperationalError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/copy-to-season")
+@retry_on_locked
 def copy_teams_to_season(
     from_season: int,
     to_season: int,
@@ -262,11 +273,14 @@ def copy_teams_to_season(
             db.add(new_team)
         
         db.commit()
+        invalidate_seasons(to_season)
         
         return {
             "message": f"Successfully copied {len(new_teams)} teams from season {from_season} to season {to_season}",
             "teams_copied": len(new_teams)
         }
+    except OperationalError:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 from .teams import TeamOut
 from .base import BaseResponse, BaseModelSchema
@@ -50,3 +50,31 @@ class GameUpdate(BaseModel):
 
 class GameResponse(BaseResponse):
     data: Optional[GameOut] = None
+
+
+# box score (GET /games/{game_id}/boxscore)
+
+class BoxScoreLine(BaseModel):
+    player_id: int
+    player_name: str
+    stats: Dict[str, Union[int, float]]
+
+class BoxScoreSide(BaseModel):
+    team_id: Optional[int] = None
+    team_name: str
+    score: int
+    totals: Dict[str, Union[int, float]]
+    # Per-player lines by category (passing, rushing, receiving, defense)
+    players: Dict[str, List[BoxScoreLine]]
+
+class BoxScore(BaseModel):
+    game_id: int
+    season: int
+    week: int
+    league: str
+    completed: bool
+    team1: BoxScoreSide
+    team2: BoxScoreSide
+
+class BoxScoreResponse(BaseResponse):
+    data: Optional[BoxScore] = None
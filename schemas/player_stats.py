@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 from .base import BaseResponse, BaseModelSchema
 
@@ -37,9 +37,8 @@ class PlayerStatsCreate(BaseModel):
     def_td: int = 0
     sacks: int = 0
 
-class PlayerStatsCreateById(BaseModel):
+class PlayerStatsLine(BaseModel):
     player_id: int
-    game_id: int
     passing_tds: int = 0
     passes_completed: int = 0
     passes_attempted: int = 0
@@ -58,6 +57,13 @@ class PlayerStatsCreateById(BaseModel):
     def_td: int = 0
     sacks: int = 0
 
+class PlayerStatsCreateById(PlayerStatsLine):
+    game_id: int
+
+# submitting every player's line for one game at once
+class PlayerStatsBulkCreate(BaseModel):
+    stats: List[PlayerStatsLine]
+
 # fetching existing stats (from db)
 class PlayerStatsOut(BaseModelSchema):
     id: int
@@ -124,4 +130,21 @@ class PlayerStatsUpdate(BaseModel):
     sacks: Optional[int] = None
 
 class PlayerStatsResponse(BaseResponse):
-    data: Optional[PlayerStatsOut] = None
\ No newline at end of file
+    data: Optional[PlayerStatsOut] = None
+
+class PlayerStatsBulkResponse(BaseResponse):
+    data: List[PlayerStatsOut] = []
+
+# season leaderboards (GET /stats/leaders)
+class LeaderboardEntry(BaseModel):
+    rank: int
+    player_name: str
+    games_played: int
+    stats: Dict[str, Union[int, float]]
+
+class LeaderboardResponse(BaseResponse):
+    season: int
+    phase: str
+    category: str
+    sort: str
+    data: List[LeaderboardEntry] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from .base import BaseResponse, BaseModelSchema
 
@@ -12,6 +12,7 @@ class PlayerBase(BaseModel):
     season: int
     is_active: bool = True
     jersey_number: Optional[str] = None
+    person_id: Optional[int] = None  # Links this season's entry to the player's other seasons
 
 
 class PlayerCreate(PlayerBase):
@@ -35,12 +36,32 @@ class PlayerUpdate(PlayerBase):
     season: Optional[int] = None
     is_active: Optional[bool] = None
     jersey_number: Optional[str] = None
+    person_id: Optional[int] = None
 
 
 class PlayerResponse(BaseResponse):
     data: Optional[PlayerOut] = None
 
 
+class CareerSeason(BaseModel):
+    season: int
+    games_played: int
+    stats: Dict[str, int]
+
+
+class PlayerCareer(BaseModel):
+    person_id: int
+    name: str
+    phase: str
+    seasons: List[CareerSeason] = []
+    games_played: int = 0
+    totals: Dict[str, int] = {}
+
+
+class PlayerCareerResponse(BaseResponse):
+    data: Optional[PlayerCareer] = None
+
+
 class PlayerWithStats(PlayerOut):
     stats: List["PlayerStatsOut"] = []
 
@@ -49,6 +49,35 @@ class TeamResponse(BaseResponse):
     data: Optional[TeamOut] = None
 
 
+# standings (GET /standings)
+
+class StandingsEntry(BaseModel):
+    rank: int
+    rank_display: str  # "T-2" when the rank is shared
+    tied: bool
+    team_id: int
+    team_name: str
+    wins: int
+    losses: int
+    ties: int
+    games_played: int
+    win_pct: float
+    points_for: int = 0
+    points_against: int = 0
+    point_differential: int = 0
+    tiebreaker: Optional[str] = None  # Tiebreaker that placed a team level on record
+
+
+class StandingsGroup(BaseModel):
+    league: str
+    season: int
+    teams: List[StandingsEntry] = []
+
+
+class StandingsResponse(BaseResponse):
+    data: List[StandingsGroup] = []
+
+
 # Import PlayerOut after TeamOut is defined
 from schemas.players import PlayerOut
 TeamWithPlayers.model_rebuild()
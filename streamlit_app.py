@@ -14,13 +14,33 @@ if 'players' not in st.session_state:
 if 'games' not in st.session_state:
     st.session_state.games = []
 
+@st.cache_resource
+def etag_store():
+    """Last ETag and body per URL, kept across reruns for conditional requests"""
+    return {}
+
+def conditional_get_json(url):
+    """GET a JSON list, reusing the stored body when the server answers 304"""
+    store = etag_store()
+    cached = store.get(url)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    response = requests.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    if "ETag" in response.headers:
+        store[url] = (response.headers["ETag"], data)
+    return data
+
 # Use st.cache_data to cache API calls for teams, players, and games
 @st.cache_data(ttl=60)
 def fetch_teams():
     try:
-        response = requests.get(f"{API_BASE_URL}/teams")
-        if response.status_code == 200:
-            return response.json()
+        data = conditional_get_json(f"{API_BASE_URL}/teams/")
+        if data is not None:
+            return data
         else:
             st.error("Failed to fetch teams")
             return []
@@ -35,9 +55,9 @@ def fetch_teams_force():
 @st.cache_data(ttl=60)
 def fetch_players():
     try:
-        response = requests.get(f"{API_BASE_URL}/players")
-        if response.status_code == 200:
-            return response.json()
+        data = conditional_get_json(f"{API_BASE_URL}/players/")
+        if data is not None:
+            return data
         else:
             st.error("Failed to fetch players")
             return []
@@ -52,9 +72,9 @@ def fetch_players_force():
 @st.cache_data(ttl=60)
 def fetch_games():
     try:
-        response = requests.get(f"{API_BASE_URL}/games")
-        if response.status_code == 200:
-            return response.json()
+        data = conditional_get_json(f"{API_BASE_URL}/games/")
+        if data is not None:
+            return data
         else:
             st.error("Failed to fetch games")
             return []
@@ -1016,18 +1036,18 @@ def standings_management():
     """Handle team standings display"""
     st.header("Standings")
     
-    # Always fetch fresh teams data
+    # Ranked server-side, one group per (league, season) of active teams
     try:
-        response = requests.get(f"{API_BASE_URL}/teams")
+        response = requests.get(f"{API_BASE_URL}/standings/")
         if response.status_code == 200:
-            teams = response.json()
+            standings = response.json()["data"]
         else:
-            st.error("Failed to fetch teams")
-            teams = []
+            st.error("Failed to fetch standings")
+            standings = []
     except requests.RequestException as e:
         st.error(f"Error connecting to API: {str(e)}")
-        teams = []
-    if teams:
+        standings = []
+    if standings:
         st.markdown("""
             <style>
                 .standings-header {
@@ -1072,67 +1092,26 @@ def standings_management():
             </style>
         """, unsafe_allow_html=True)
         
-        # Group teams by league and season
-        team_groups = {}
-        for team in teams:
-            if team["is_active"]:  # Only show active teams
-                key = (team["league"], team["season"])
-                if key not in team_groups:
-                    team_groups[key] = []
-                team_groups[key].append(team)
-        
-        # Sort keys by season (descending) and then league
-        sorted_keys = sorted(team_groups.keys(), key=lambda x: (-x[1], x[0]))
-        
-        # Display standings for each league/season
-        for (league, season) in sorted_keys:
-            league_teams = team_groups[(league, season)]
+        # Groups arrive sorted by season (descending) and then league
+        for group in standings:
+            league, season = group["league"], group["season"]
             with st.expander(f"{league} - Season {season}", expanded=True):
                 # Add the styled header
                 st.markdown(f'<div class="standings-header">{league} - Season {season}</div>', unsafe_allow_html=True)
                 
-                # Sort teams by win percentage
-                sorted_teams = sorted(
-                    league_teams,
-                    key=lambda x: (
-                        (x["wins"] + 0.5 * x["ties"]) / (x["wins"] + x["losses"] + x["ties"]) if (x["wins"] + x["losses"] + x["ties"]) > 0 else 0,
-                        x["wins"],
-                        -x["losses"]
-                    ),
-                    reverse=True
-                )
-                
-                # Create a table of standings
-                standings_data = []
-                current_rank = 1
-                previous_record = None
-                tied_teams = 1
-
-                for i, team in enumerate(sorted_teams):
-                    games_played = team["wins"] + team["losses"] + team["ties"]
-                    win_pct = (team["wins"] + 0.5 * team["ties"]) / games_played if games_played > 0 else 0.000
-                    current_record = (win_pct, team["wins"], -team["losses"])
-                    
-                    # Check if this team is tied with the previous team
-                    if previous_record and previous_record == current_record:
-                        tied_teams += 1
-                    else:
-                        current_rank = i + 1 - (tied_teams - 1)
-                        tied_teams = 1
-                    
-                    rank_display = f"T-{current_rank}" if tied_teams > 1 else str(current_rank)
-                    
-                    standings_data.append({
-                        "Rank": rank_display,
-                        "Team": team["name"],
+                standings_data = [
+                    {
+                        "Rank": team["rank_display"],
+                        "Team": team["team_name"],
                         "W": team["wins"],
                         "L": team["losses"],
                         "T": team["ties"],
-                        "PCT": f"{win_pct:.3f}",
-                        "GP": games_played
-                    })
-                    
-                    previous_record = current_record
+                        "PCT": f"{team['win_pct']:.3f}",
+                        "GP": team["games_played"],
+                        "PD": team["point_differential"]
+                    }
+                    for team in group["teams"]
+                ]
                 
                 if standings_data:
                     # Convert to DataFrame and display with custom styling
@@ -1184,102 +1163,26 @@ def season_management():
                 
                 if st.button("End Selected Season", type="primary"):
                     try:
-                        # Get all active teams for the selected season
-                        season_teams = [team for team in teams if team["season"] == selected_season and team["is_active"]]
-                        
-                        if not season_teams:
-                            st.warning(f"No active teams found for season {selected_season}")
+                        # One server-side call deactivates every team and player of the season
+                        response = requests.post(f"{API_BASE_URL}/teams/teams/end-season/{selected_season}")
+                        if response.status_code != 200:
+                            st.error(f"Failed to end season: {response.text}")
                             return
-                        
-                        teams_updated = 0
-                        failed_teams = []
-                        players_updated = 0
-                        failed_players = []
-                        
-                        # First, get all active players for this season
-                        players = fetch_players()
-                        season_players = [
-                            player for player in players 
-                            if player["season"] == selected_season and player["is_active"]
-                        ]
-                        
-                        # Update each team's active status
-                        for team in season_teams:
-                            try:
-                                # Prepare the update data
-                                update_data = {
-                                    "name": team["name"],
-                                    "season": team["season"],
-                                    "league": team["league"],
-                                    "wins": team["wins"],
-                                    "losses": team["losses"],
-                                    "ties": team["ties"],
-                                    "is_active": 0  # Set to inactive
-                                }
-                                
-                                # Send PUT request to update the team
-                                response = requests.put(
-                                    f"{API_BASE_URL}/teams/{team['id']}",
-                                    json=update_data,
-                                    params={"version": team["version"]}
-                                )
-                                
-                                if response.status_code == 200:
-                                    teams_updated += 1
-                                else:
-                                    failed_teams.append(team["name"])
-                            except Exception as e:
-                                failed_teams.append(team["name"])
-                                st.error(f"Error updating team {team['name']}: {str(e)}")
-                        
-                        # Update each player's active status
-                        for player in season_players:
-                            try:
-                                # Prepare the update data
-                                update_data = {
-                                    "name": player["name"],
-                                    "team_name": player["team_name"],
-                                    "season": player["season"],
-                                    "jersey_number": player["jersey_number"],
-                                    "is_active": False  # Set to inactive
-                                }
-                                
-                                # Send PUT request to update the player
-                                response = requests.put(
-                                    f"{API_BASE_URL}/players/{player['id']}",
-                                    json=update_data,
-                                    params={"version": player["version"]}
-                                )
-                                
-                                if response.status_code == 200:
-                                    players_updated += 1
-                                else:
-                                    failed_players.append(player["name"])
-                            except Exception as e:
-                                failed_players.append(player["name"])
-                                st.error(f"Error updating player {player['name']}: {str(e)}")
+                        result = response.json()
+                        teams_updated = result["teams_updated"]
+                        players_updated = result["players_updated"]
                         
                         # Show results
                         if teams_updated > 0 or players_updated > 0:
                             st.success(f"""Successfully ended Season {selected_season}:
                             - {teams_updated} teams marked as inactive
                             - {players_updated} players marked as inactive""")
-                            
-                            if failed_teams:
-                                st.warning(f"Failed to update some teams: {', '.join(failed_teams)}")
-                            if failed_players:
-                                st.warning(f"Failed to update some players: {', '.join(failed_players)}")
-                                
                             st.info("You can now create new teams for the next season.")
                             # Clear caches to refresh data
                             fetch_teams_force()
                             fetch_players_force()
                         else:
-                            st.error("Failed to end season. No teams or players were updated.")
-                            if failed_teams:
-                                st.error(f"Failed teams: {', '.join(failed_teams)}")
-                            if failed_players:
-                                st.error(f"Failed players: {', '.join(failed_players)}")
+                            st.warning(f"No active teams or players found for season {selected_season}")
                     except Exception as e:
                         st.error(f"Error ending season: {str(e)}")
             else:
@@ -1385,6 +1288,67 @@ def season_management():
     else:
         st.info("No teams available. You can create teams for your first season in the Team Management section.")
 
+# Column headers for each leaderboard category returned by /stats/leaders
+LEADERBOARD_COLUMNS = {
+    "passing": {'passing_tds': 'Pass TD', 'qb_rushing_tds': 'Rush TD', 'interceptions_thrown': 'INT', 'completion_pct': 'Comp %'},
+    "rushing": {'rush_attempts': 'Att', 'rushing_tds': 'TD', 'first_downs': '1st'},
+    "receiving": {'receptions': 'Rec', 'targets': 'Tgt', 'receiving_tds': 'TD', 'drops': 'Drops', 'first_downs': '1st', 'catch_pct': 'Catch %'},
+    "defense": {'interceptions': 'INT', 'sacks': 'Sacks', 'def_td': 'TD', 'flag_pulls': 'FP', 'pass_breakups': 'PB'},
+}
+
+def fetch_leaderboard(season, phase, category):
+    """Aggregated leaderboard rows for one category, cached in session state"""
+    key = f"stats_season_{season}_{phase}_{category}"
+    if key not in st.session_state:
+        response = requests.get(f"{API_BASE_URL}/stats/leaders", params={"season": season, "phase": phase, "category": category})
+        if response.status_code != 200:
+            st.error("Failed to fetch stats.")
+            return []
+        st.session_state[key] = response.json()["data"]
+    return st.session_state[key]
+
+def leaderboard_frame(category, rows, extra_columns=()):
+    """DataFrame for one category from rows of {'player_name', 'stats', ...extra_columns}"""
+    df = pd.DataFrame([{**{key: row[key] for key in extra_columns}, 'player_name': row['player_name'], **row['stats']} for row in rows])
+    if category == "passing":
+        df['C/ATT'] = df['passes_completed'].astype(str) + '/' + df['passes_attempted'].astype(str)
+        df = df[[*extra_columns, 'player_name', 'C/ATT', 'completion_pct', 'passing_tds', 'qb_rushing_tds', 'interceptions_thrown']]
+    return df.rename(columns={'player_name': 'Player', **LEADERBOARD_COLUMNS[category]})
+
+def render_leaderboards(season, phase, empty_message):
+    shown = False
+    for category in LEADERBOARD_COLUMNS:
+        rows = fetch_leaderboard(season, phase, category)
+        if not rows:
+            continue
+        shown = True
+        st.subheader(f"{category.capitalize()} Leaderboard")
+        st.dataframe(leaderboard_frame(category, rows), hide_index=True)
+    if not shown:
+        st.info(empty_message)
+
+def fetch_boxscore(game_id):
+    """Box score of one game, cached in session state"""
+    key = f"stats_game_{game_id}"
+    if key not in st.session_state:
+        response = requests.get(f"{API_BASE_URL}/games/{game_id}/boxscore")
+        if response.status_code != 200:
+            st.error("Failed to fetch stats.")
+            return None
+        st.session_state[key] = response.json()["data"]
+    return st.session_state[key]
+
+def render_boxscore(boxscore):
+    sides = [boxscore['team1'], boxscore['team2']]
+    for category in LEADERBOARD_COLUMNS:
+        rows = [dict(line, Team=side['team_name']) for side in sides for line in side['players'][category]]
+        if rows:
+            st.subheader(category.capitalize())
+            st.dataframe(leaderboard_frame(category, rows, extra_columns=('Team',)), hide_index=True)
+    st.subheader("Team Totals")
+    totals = pd.DataFrame([{'Team': side['team_name'], 'Score': side['score'], **side['totals']} for side in sides])
+    st.dataframe(totals, hide_index=True)
+
 def stats_tab():
     st.header("Stats")
     # Add a refresh button
@@ -1435,208 +1399,19 @@ def stats_tab():
         selected_game = st.selectbox("Select Game", options=list(game_options.keys()), key="stats_per_game_select")
         selected_game_id = game_options[selected_game]
         
-        stats_key = f"stats_game_{selected_game_id}"
-        if stats_key in st.session_state:
-            stats = st.session_state[stats_key]
-        else:
-            response = requests.get(f"{API_BASE_URL}/stats/batch/?game_id={selected_game_id}")
-            if response.status_code == 200:
-                stats = response.json()
-                st.session_state[stats_key] = stats
-            else:
-                st.error("Failed to fetch stats.")
-                stats = []
-                
-        if stats:
-            df = pd.DataFrame(stats)
-            # Passing Box Score
-            st.subheader("Passing")
-            qb_cols = ['player_name', 'passes_completed', 'passes_attempted', 'passing_tds', 'interceptions_thrown', 'qb_rushing_tds']
-            qb_df = df[qb_cols].copy()
-            qb_df = qb_df[(qb_df[qb_cols[1:]] != 0).any(axis=1)]
-            qb_df['C/ATT'] = qb_df['passes_completed'].astype(str) + '/' + qb_df['passes_attempted'].astype(str)
-            qb_df['Comp %'] = (qb_df['passes_completed'] / qb_df['passes_attempted'].replace(0, pd.NA) * 100).round(1).fillna(0)
-            qb_df = qb_df.rename(columns={
-                'player_name': 'Player',
-                'passing_tds': 'Pass TD',
-                'interceptions_thrown': 'INT',
-                'passes_completed': 'Comp',
-                'passes_attempted': 'Att',
-                'qb_rushing_tds': 'Rush TD'
-            })
-            qb_df = qb_df[['Player', 'C/ATT', 'Comp %', 'Pass TD', 'Rush TD', 'INT']]
-            st.dataframe(qb_df, hide_index=True)
-            
-            # Rushing Box Score
-            st.subheader("Rushing")
-            rush_cols = ['player_name', 'rush_attempts', 'rushing_tds', 'first_downs']
-            rush_df = df[rush_cols].copy()
-            rush_df = rush_df[(rush_df[rush_cols[1:]] != 0).any(axis=1)]
-            rush_df = rush_df.rename(columns={
-                'player_name': 'Player',
-                'rush_attempts': 'Att',
-                'rushing_tds': 'TD',
-                'first_downs': '1st'
-            })
-            rush_df = rush_df[rush_df['Att'] > 0]
-            st.dataframe(rush_df, hide_index=True)
-            
-            # Receiving Box Score
-            st.subheader("Receiving")
-            rec_cols = ['player_name', 'receptions', 'targets', 'receiving_tds', 'drops', 'first_downs']
-            rec_df = df[rec_cols].copy()
-            rec_df = rec_df[(rec_df[rec_cols[1:]] != 0).any(axis=1)]
-            rec_df = rec_df.rename(columns={
-                'player_name': 'Player',
-                'receptions': 'Rec',
-                'targets': 'Tgt',
-                'receiving_tds': 'TD',
-                'drops': 'Drops',
-                'first_downs': '1st'
-            })
-            rec_df = rec_df.sort_values(by='Tgt', ascending=False)
-            st.dataframe(rec_df, hide_index=True)
-            
-            # Defense Box Score
-            st.subheader("Defense")
-            def_cols = ['player_name', 'interceptions', 'sacks', 'def_td', 'flag_pulls', 'pass_breakups']
-            def_df = df[def_cols].copy()
-            def_df = def_df[(def_df[def_cols[1:]] != 0).any(axis=1)]
-            def_df = def_df.rename(columns={
-                'player_name': 'Player',
-                'interceptions': 'INT',
-                'sacks': 'Sacks',
-                'def_td': 'TD',
-                'flag_pulls': 'FP',
-                'pass_breakups': 'PB'
-            })
-            def_df = def_df.sort_values(by='FP', ascending=False)
-            st.dataframe(def_df, hide_index=True)
+        boxscore = fetch_boxscore(selected_game_id)
+        if boxscore and any(boxscore[side]['players'][category] for side in ('team1', 'team2') for category in LEADERBOARD_COLUMNS):
+            render_boxscore(boxscore)
         else:
             st.info("No stats for this game.")
             
     elif view == "Leaderboard (Reg. Season)":
-        stats_key = f"stats_season_{selected_season}_regular"
-        if stats_key in st.session_state:
-            stats = st.session_state[stats_key]
-        else:
-            response = requests.get(f"{API_BASE_URL}/stats/batch/?season={selected_season}")
-            if response.status_code == 200:
-                all_stats = response.json()
-                # Exclude playoff weeks (6, 7)
-                regular_game_ids = [g['id'] for g in games if g['season'] == selected_season and g['week'] not in [6, 7]]
-                stats = [s for s in all_stats if s.get('game_id') in regular_game_ids]
-                st.session_state[stats_key] = stats
-            else:
-                st.error("Failed to fetch stats.")
-                stats = []
-                
-        if stats:
-            df = pd.DataFrame(stats)
-            # Passing Leaderboard
-            st.subheader("Passing Leaderboard")
-            qb_cols = ['player_name', 'passes_completed', 'passes_attempted', 'passing_tds', 'interceptions_thrown', 'qb_rushing_tds']
-            qb_leader = df.groupby('player_name')[qb_cols[1:]].sum().reset_index()
-            qb_leader = qb_leader[(qb_leader[qb_cols[1:]] != 0).any(axis=1)]
-            qb_leader['C/ATT'] = qb_leader['passes_completed'].astype(str) + '/' + qb_leader['passes_attempted'].astype(str)
-            qb_leader['Comp %'] = (qb_leader['passes_completed'] / qb_leader['passes_attempted'].replace(0, pd.NA) * 100).round(1).fillna(0)
-            qb_leader = qb_leader.rename(columns={
-                'player_name': 'Player',
-                'passing_tds': 'Pass TD',
-                'interceptions_thrown': 'INT',
-                'passes_completed': 'Comp',
-                'passes_attempted': 'Att',
-                'qb_rushing_tds': 'Rush TD'
-            })
-            qb_leader = qb_leader[['Player', 'C/ATT', 'Comp %', 'Pass TD', 'Rush TD', 'INT']]
-            qb_leader = qb_leader.sort_values(by=['Pass TD', 'Rush TD'], ascending=False)
-            st.dataframe(qb_leader, hide_index=True)
-            
-            # Rushing Leaderboard
-            st.subheader("Rushing Leaderboard")
-            rush_cols = ['player_name', 'rush_attempts', 'rushing_tds', 'first_downs']
-            rush_leader = df.groupby('player_name')[rush_cols[1:]].sum().reset_index()
-            rush_leader = rush_leader[(rush_leader[rush_cols[1:]] != 0).any(axis=1)]
-            rush_leader = rush_leader.rename(columns={
-                'player_name': 'Player',
-                'rush_attempts': 'Att',
-                'rushing_tds': 'TD',
-                'first_downs': '1st'
-            })
-            rush_leader = rush_leader[rush_leader['Att'] > 0]
-            rush_leader = rush_leader.sort_values(by='TD', ascending=False)
-            st.dataframe(rush_leader, hide_index=True)
-            
-            # Receiving Leaderboard
-            st.subheader("Receiving Leaderboard")
-            rec_cols = ['player_name', 'receptions', 'targets', 'receiving_tds', 'drops', 'first_downs']
-            rec_leader = df.groupby('player_name')[rec_cols[1:]].sum().reset_index()
-            rec_leader = rec_leader[(rec_leader[rec_cols[1:]] != 0).any(axis=1)]
-            rec_leader = rec_leader.rename(columns={
-                'player_name': 'Player',
-                'receptions': 'Rec',
-                'targets': 'Tgt',
-                'receiving_tds': 'TD',
-                'drops': 'Drops',
-                'first_downs': '1st'
-            })
-            rec_leader = rec_leader.sort_values(by='Rec', ascending=False)
-            st.dataframe(rec_leader, hide_index=True)
-            
-            # Defense Leaderboard
-            st.subheader("Defense Leaderboard")
-            def_cols = ['player_name', 'interceptions', 'sacks', 'def_td', 'flag_pulls', 'pass_breakups']
-            def_leader = df.groupby('player_name')[def_cols[1:]].sum().reset_index()
-            def_leader = def_leader[(def_leader[def_cols[1:]] != 0).any(axis=1)]
-            def_leader = def_leader.rename(columns={
-                'player_name': 'Player',
-                'interceptions': 'INT',
-                'sacks': 'Sacks',
-                'def_td': 'TD',
-                'flag_pulls': 'FP',
-                'pass_breakups': 'PB'
-            })
-            def_leader = def_leader.sort_values(by='FP', ascending=False)
-            st.dataframe(def_leader, hide_index=True)
-        else:
-            st.info(f"No regular season stats available for Season {selected_season}.")
-            
+        render_leaderboards(selected_season, "regular", f"No regular season stats available for Season {selected_season}.")
+
     elif view == "Leaderboard (Playoffs)":
-        stats_key = f"stats_season_{selected_season}_playoffs"
-        if stats_key in st.session_state:
-            stats = st.session_state[stats_key]
-        else:
-            response = requests.get(f"{API_BASE_URL}/stats/batch/?season={selected_season}")
-            if response.status_code == 200:
-                all_stats = response.json()
-                playoff_game_ids = [g['id'] for g in games if g['season'] == selected_season and g['week'] in [6, 7]]
-                stats = [s for s in all_stats if s.get('game_id') in playoff_game_ids]
-                st.session_state[stats_key] = stats
-            else:
-                st.error("Failed to fetch stats.")
-                stats = []
-                
-        if stats:
-            df = pd.DataFrame(stats)
-            st.header(f"Playoffs Leaderboard")
-            # Passing Leaderboard
-            st.subheader("Passing Leaderboard")
-            qb_cols = ['player_name', 'passes_completed', 'passes_attempted', 'passing_tds', 'interceptions_thrown', 'qb_rushing_tds']
-            qb_leader = df.groupby('player_name')[qb_cols[1:]].sum().reset_index()
-            qb_leader = qb_leader[(qb_leader[qb_cols[1:]] != 0).any(axis=1)]
-            qb_leader['C/ATT'] = qb_leader['passes_completed'].astype(str) + '/' + qb_leader['passes_attempted'].astype(str)
-            qb_leader['Comp %'] = (qb_leader['passes_completed'] / qb_leader['passes_attempted'].replace(0, pd.NA) * 100).round(1).fillna(0)
-            qb_leader = qb_leader.rename(columns={
-                'player_name': 'Player',
-                'passing_tds': 'Pass TD',
-                'interceptions_thrown': 'INT',
-                'passes_completed': 'Comp',
-                'passes_attempted': 'Att',
-                'qb_rushing_tds': 'Rush TD'
-            })
-            qb_leader = qb_leader[['Player', 'C/ATT', 'Comp %', 'Pass TD', 'Rush TD', 'INT']]
-            qb_leader = qb_leader.sort_values(by=['Pass TD', 'Rush TD'], ascending=False)
-            st.dataframe(qb_leader, hide_index=True)
+        st.header(f"Playoffs Leaderboard")
+        render_leaderboards(selected_season, "playoff", f"No playoff stats available for Season {selected_season}.")
+
 
 def main():
     st.title("Flag Football Stats App")